@@ -1,7 +1,9 @@
-import json
-import requests
+import itertools
+
 import yaml
 
+import api_tools as at
+
 #####################################################################
 # VGL
 #####################################################################
@@ -18,23 +20,28 @@ vgl_fieldnames = [
 vgl_output_filename = "vgp.raw"
 
 
-def vgl_url_opener(**kwargs):
-    vgl_url = "https://raw.githubusercontent.com/vgl-hub/genome-portal/master/_data/table_tracker.yml"
-    return requests.get(vgl_url, stream=True)
+vgl_url = "https://raw.githubusercontent.com/vgl-hub/genome-portal/master/_data/table_tracker.yml"
+
+# the C loader is much faster on the large tracker file, if libyaml is available
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+class VglAdapter(at.SourceAdapter):
+    fieldnames = vgl_fieldnames
+    output_filename = vgl_output_filename
 
+    def request(self, token=None, **params):
+        return self.session.get(vgl_url)
 
-def vgl_hub_count_handler(r_text):
-    vgp_yaml = yaml.safe_load(r_text)
-    return len(vgp_yaml["toc"])
+    def parse(self, response):
+        return yaml.load(response.content, Loader=YamlLoader)
 
+    def count(self, payload):
+        return len(payload["toc"])
 
-def vgl_row_handler(r_text, fieldnames, **kwargs):
-    vgp_yaml = yaml.safe_load(r_text)
-    result = []
-    for species in vgp_yaml["toc"]:
-        d = [species.get(f) for f in fieldnames]
-        result.append(d)
-    return result
+    def rows(self, payload, token=None):
+        for species in payload["toc"]:
+            yield [species.get(f) for f in self.fieldnames]
 
 
 #####################################################################
@@ -80,38 +87,39 @@ nhm_headers = {
 }
 
 
-def nhm_url_opener(**kwargs):
-    print(nhm_url)
-    return requests.post(nhm_url, headers=nhm_headers, json=nhm_post_data)
-
-
-def nhm_api_count_handler(r_text):
-    j = json.loads(r_text)
-    nhm_total = j["result"]["total"]
-    print(f"NHM total count: {nhm_total}")
-    return nhm_total
-
-
-def nhm_row_handler(fieldnames, **kwargs):
-    nhm_post_data_after = nhm_post_data
-    result = []
-    while True:
-        response = requests.post(nhm_url, headers=nhm_headers, json=nhm_post_data_after)
-        r = response.json()
-        dl = r["result"]["records"]
-        for species in dl:
-            item_value = []
-            for f in fieldnames:
-                field_value = species["data"].get(f)
-                if f == "otherCatalogNumbers":
-                    field_value = field_value[17:]
-                item_value.append(field_value)
-            result.append(item_value)
-        print(r["result"]["after"])
-        nhm_post_data_after.update({"after": r["result"]["after"]})
-        if r["result"]["after"] == None:
-            break
-    return result
+class NhmAdapter(at.SourceAdapter):
+    fieldnames = nhm_fieldnames
+    output_filename = nhm_output_filename
+
+    def request(self, token=None, after=None):
+        if after is None:
+            print(nhm_url)
+        post_data = (
+            nhm_post_data if after is None else {**nhm_post_data, "after": after}
+        )
+        return self.session.post(nhm_url, headers=nhm_headers, json=post_data)
+
+    def count(self, payload):
+        nhm_total = payload["result"]["total"]
+        print(f"NHM total count: {nhm_total}")
+        return nhm_total
+
+    def rows(self, payload, token=None):
+        # follow the after cursor from the first page until there are no more
+        while True:
+            for species in payload["result"]["records"]:
+                item_value = []
+                for f in self.fieldnames:
+                    field_value = species["data"].get(f)
+                    if f == "otherCatalogNumbers":
+                        field_value = field_value[17:]
+                    item_value.append(field_value)
+                yield item_value
+            after = payload["result"]["after"]
+            print(after)
+            if after is None:
+                break
+            payload = self.fetch(token, after=after)
 
 
 #####################################################################
@@ -168,57 +176,63 @@ sts_fieldnames = [
 ]
 
 
-def sts_url_opener(token):
-    return requests.get(
-        sts_url, headers={"Token": token, "Project": "ALL"}, verify=False
-    )
-
-
-def sts_api_count_handler(r_text):
-    j = json.loads(r_text)
-    return j["data"]["total"]
-
-
-def sts_row_handler(result_count, fieldnames, token, **kwargs):
-    page_size = 100
-    result = []
-
-    for page in range(1, int(result_count / page_size) + 2):
-        print(page)
-
-        url = f"{sts_url}?page={page}&page_size={page_size}"
-        r = requests.get(
-            url, headers={"Token": token, "Project": "ALL"}, verify=False
-        ).json()
-        dl = r["data"]["list"]
-
-        for species in dl:
-            sequencing_status_simple = "sample_collected"  # default
-            lws = species.get("lab_work_status")
-            if "NOVEL" in str(lws) or "ASSIGNED_TO_LAB" in str(lws):
-                sequencing_status_simple = "sample_acquired"
-            else:
-                sequencing_status_simple = "in_progress"
-
-            species["sequencing_status_simple"] = sequencing_status_simple
-
-            pc = species.get("project_code")
-            for p in pc:
-                species[f"sequencing_status_{p.lower()}"] = sequencing_status_simple
-
-            if sequencing_status_simple == "in_progress":
-                species["sample_collected"] = ",".join(pc)
-                species["sample_acquired"] = ",".join(pc)
-                species["in_progress"] = ",".join(pc)
-
-            elif sequencing_status_simple == "sample_acquired":
-                species["sample_collected"] = ",".join(pc)
-                species["sample_acquired"] = ",".join(pc)
-            elif sequencing_status_simple == "sample_collected":
-                species["sample_collected"] = ",".join(pc)
-            species["submitted_gals"] = ",".join(species.get("submitted_gals"))
-
-            d = [[species.get(f) for f in fieldnames]]
-            result.extend(d)
-
-    return result
+sts_page_size = 100
+
+
+def sts_species_row(species, fieldnames):
+    sequencing_status_simple = "sample_collected"  # default
+    lws = species.get("lab_work_status")
+    if "NOVEL" in str(lws) or "ASSIGNED_TO_LAB" in str(lws):
+        sequencing_status_simple = "sample_acquired"
+    else:
+        sequencing_status_simple = "in_progress"
+
+    species["sequencing_status_simple"] = sequencing_status_simple
+
+    pc = species.get("project_code")
+    for p in pc:
+        species[f"sequencing_status_{p.lower()}"] = sequencing_status_simple
+
+    if sequencing_status_simple == "in_progress":
+        species["sample_collected"] = ",".join(pc)
+        species["sample_acquired"] = ",".join(pc)
+        species["in_progress"] = ",".join(pc)
+
+    elif sequencing_status_simple == "sample_acquired":
+        species["sample_collected"] = ",".join(pc)
+        species["sample_acquired"] = ",".join(pc)
+    elif sequencing_status_simple == "sample_collected":
+        species["sample_collected"] = ",".join(pc)
+    species["submitted_gals"] = ",".join(species.get("submitted_gals"))
+
+    return [species.get(f) for f in fieldnames]
+
+
+class StsAdapter(at.SourceAdapter):
+    fieldnames = sts_fieldnames
+    output_filename = sts_output_filename
+
+    def request(self, token=None, page=1):
+        return self.session.get(
+            sts_url,
+            params={"page": page, "page_size": sts_page_size},
+            headers={"Token": token, "Project": "ALL"},
+            verify=False,
+        )
+
+    def count(self, payload):
+        return payload["data"]["total"]
+
+    def rows(self, payload, token=None):
+        # the first page comes with the count, so the remaining pages are known
+        # and can be fetched concurrently, they are still written in order
+        last_page = int(self.count(payload) / sts_page_size) + 1
+        pages = at.fetch_pages(
+            lambda page: self.fetch(token, page=page),
+            range(2, last_page + 1),
+            self.workers,
+        )
+        for page, payload in enumerate(itertools.chain([payload], pages), start=1):
+            print(page)
+            for species in payload["data"]["list"]:
+                yield sts_species_row(species, self.fieldnames)
@@ -1,31 +1,133 @@
-# import requests
+import contextlib
 import csv
 import os
+import random
 import sys
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from itertools import islice
 from traceback import format_exc
 
+import requests
 
-def get_from_source(
-    url_opener, count_handler, row_handler, fieldnames, output_filename, token=None
-):
-    try:
-        r = url_opener(token=token)
-        if r.status_code != 200:
-            raise ValueError(f"bad response: {r.status_code}")
-        r_text = r.text
-        result_count = count_handler(r_text)
-        print(f"count to create is {result_count}")
-        rows = row_handler(
-            r_text=r_text, result_count=result_count, fieldnames=fieldnames, token=token
+
+def request_with_retries(request, retries=3, max_delay=30):
+    """Call request() until it returns a successful response.
+
+    Only the failing request is repeated, after a random delay that grows with
+    each attempt. The last error is raised once all attempts have failed.
+    """
+    for attempt in range(1, retries + 1):
+        try:
+            response = request()
+            response.raise_for_status()
+            return response
+        except requests.RequestException as exc:
+            if attempt == retries:
+                raise
+            delay = random.uniform(0, min(max_delay, 2 ** (attempt - 1)))
+            print(
+                f"Connection error {exc} occurred for attempt {attempt}/{retries} "
+                f"of accessing API. Retrying in {delay:.1f} seconds..."
+            )
+            time.sleep(delay)
+
+
+def fetch_pages(fetch, pages, workers=8):
+    """Yield fetch(page) for each page, in order, fetching several at once.
+
+    At most twice as many pages as workers are fetched ahead of the one being
+    yielded, so memory use does not grow with the number of pages.
+    """
+    pages = iter(pages)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque(
+            executor.submit(fetch, page) for page in islice(pages, workers * 2)
         )
-        os.makedirs(os.path.dirname(output_filename), exist_ok=True)
-        with open(output_filename, "w") as output_file:
+        while pending:
+            payload = pending.popleft().result()
+            pending.extend(executor.submit(fetch, page) for page in islice(pages, 1))
+            yield payload
+
+
+class SourceAdapter(ABC):
+    """An API source that parses each payload once and yields rows.
+
+    Subclasses set fieldnames and output_filename and implement:
+        request(token, **params): make one request and return the response.
+        parse(response): parse the payload of a response.
+        count(payload): the number of rows the source has, from the first payload.
+        rows(payload, token): yield a list of field values for each row, starting
+            with the rows in the first payload and fetching any further pages.
+
+    Requests should go through self.session, which keeps connections alive for
+    up to `workers` concurrent requests.
+    """
+
+    fieldnames = []
+    output_filename = None
+    workers = 8
+
+    @cached_property
+    def session(self):
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.workers)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @abstractmethod
+    def request(self, token=None, **params):
+        pass
+
+    def parse(self, response):
+        return response.json()
+
+    @abstractmethod
+    def count(self, payload):
+        pass
+
+    @abstractmethod
+    def rows(self, payload, token=None):
+        pass
+
+    def fetch(self, token=None, **params):
+        response = request_with_retries(lambda: self.request(token, **params))
+        return self.parse(response)
+
+
+def write_tsv(rows, fieldnames, output_filename):
+    """Write rows to a TSV file as they are yielded.
+
+    The file is only put in place once every row has been written, a partial
+    file is removed so only complete files are left in the output directory.
+    """
+    try:
+        with open(f"{output_filename}.tmp", "w") as output_file:
             writer = csv.writer(output_file, delimiter="\t", lineterminator="\n")
             writer.writerow(fieldnames)
             writer.writerows(rows)
-    except Exception as exc:
+    except Exception:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(f"{output_filename}.tmp")
+        raise
+    os.replace(f"{output_filename}.tmp", output_filename)
+
+
+def get_from_source(adapter, output_filename, token=None):
+    # make the directory first so a failure can always be marked
+    os.makedirs(os.path.dirname(output_filename), exist_ok=True)
+    try:
+        payload = adapter.fetch(token)
+        result_count = adapter.count(payload)
+        print(f"count to create is {result_count}")
+        write_tsv(adapter.rows(payload, token), adapter.fieldnames, output_filename)
+    except Exception:
         print(f"something has gone wrong: {output_filename}")
-        print(format_exc(exc))
+        print(format_exc())
         try:
             open(f"{output_filename}.failed", "x")
         except FileExistsError:
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Compare sequential and streaming BlobToolKit dataset parsing.
+
+Serves synthetic search results for several overlapping roots from a local stub
+of the BlobToolKit API, then parses them with the previous approach (fetch and
+decode each root in turn) and with `btk_parser`. Reports the time and peak
+traced memory of each and checks that both produce the same unique datasets.
+
+Usage:
+    python scripts/benchmarks/benchmark_btk_streaming.py -n 20000
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import ujson
+from tolkein import tofetch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import parse_blobtoolkit as btk  # noqa: E402
+
+ROOTS = {
+    "Eukaryota": lambda i: True,
+    "Metazoa": lambda i: i % 2 == 0,
+    "Arthropoda": lambda i: i % 4 == 0,
+    "Chordata": lambda i: i % 4 == 2,
+}
+
+
+def make_dataset(i: int) -> dict:
+    """Build a synthetic BlobToolKit search result."""
+    return {
+        "id": f"DS{i:06d}",
+        "accession": f"GCA_{i:09d}.1",
+        "taxid": 1000 + i,
+        "taxon_name": f"Genus species{i}",
+        "species": f"Genus species{i}",
+        "assembly_span": 1000000 + i,
+        "contig_count": 100 + i % 50,
+        "summaryStats": {
+            "busco": {
+                "eukaryota_odb10": {"string": "C:95.0%[S:94.0%]", "c": 240, "t": 255}
+            },
+            "stats": {"noHit": 0.01, "target": 0.98},
+            "baseComposition": {"at": 0.6, "gc": 0.39, "n": 0.01},
+            "readMapping": [{"id": f"SRR{i}"}] if i % 3 else [],
+        },
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serve search results slowly enough to look like a remote API."""
+
+    def do_GET(self):
+        root = self.path.rsplit("/", 1)[-1]
+        body = self.server.bodies.get(root, b"[]")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        step = self.server.chunk_size
+        for start in range(0, len(body), step):
+            self.wfile.write(body[start : start + step])
+            time.sleep(self.server.delay)
+
+    def log_message(self, *args):
+        pass
+
+
+def fetch_btk_datasets(root: str) -> list:
+    """Fetch and decode all BlobToolKit taxon entries for a root at once."""
+    page = tofetch.fetch_url(f"{btk.BTK_API}/search/{root}")
+    return ujson.decode(page)
+
+
+def sequential_parser(opts: dict) -> tuple:
+    """Parse datasets the way btk_parser did before streaming."""
+    parsed = []
+    analyses = []
+    for root in opts["btk-root"]:
+        if datasets := fetch_btk_datasets(root):
+            for meta in datasets:
+                files = btk.describe_btk_files(meta)
+                analyses += files
+                btk.extract_btk_stats(meta)
+                parsed.append(meta)
+    return parsed, analyses
+
+
+def run_parser(parser, opts: dict) -> tuple:
+    """Run a parser and report its time and peak traced memory."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    parsed, analyses = parser(None, opts) if parser is btk.btk_parser else parser(opts)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return parsed, analyses, elapsed, peak
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-n", "--datasets", type=int, default=20000)
+    parser.add_argument("--chunk-size", type=int, default=262144)
+    parser.add_argument("--delay", type=float, default=0.01)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.bodies = {
+        root: ujson.encode(
+            [make_dataset(i) for i in range(args.datasets) if member(i)]
+        ).encode()
+        for root, member in ROOTS.items()
+    }
+    server.chunk_size = args.chunk_size
+    server.delay = args.delay
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    opts = {"btk-root": list(ROOTS)}
+    api = f"http://127.0.0.1:{server.server_port}/api/v1"
+
+    with mock.patch.object(btk, "BTK_API", api):
+        old, old_files, old_time, old_peak = run_parser(sequential_parser, opts)
+        new, new_files, new_time, new_peak = run_parser(btk.btk_parser, opts)
+    server.shutdown()
+
+    unique = {}
+    for meta in old:
+        unique.setdefault(meta["id"], meta)
+    expected_files = list(
+        {(entry["analysis_id"], entry["name"]): entry for entry in old_files}.values()
+    )
+    print(f"datasets:   {len(old)} sequential, {len(new)} streaming")
+    print(f"sequential: {old_time:.2f}s, peak {old_peak / 1e6:.1f} MB")
+    print(f"streaming:  {new_time:.2f}s, peak {new_peak / 1e6:.1f} MB")
+    print(f"speedup:    {old_time / new_time:.1f}x")
+    print(
+        "mismatches:",
+        int(list(unique.values()) != new) + int(expected_files != new_files),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Compare the header-only GenBank scanner with the BioPython parser.
+
+Parses a RefSeq release file, e.g. mitochondrion.1.genomic.gbff.gz, using both
+`scan_flatfile` and `SeqIO.parse`, reports the time taken by each and checks that
+both produce the same fields for every record.
+
+Usage:
+    python scripts/benchmarks/benchmark_refseq_scanner.py \\
+        mitochondrion.1.genomic.gbff.gz
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from unittest import mock
+
+from Bio import SeqIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import parse_refseq_organelles as refseq  # noqa: E402
+
+ANNOTATION_KEYS = ("organism", "taxonomy", "date", "comment")
+
+
+def biopython_records(fh, root_taxon=None):
+    """Parse a binary GenBank file handle with BioPython."""
+    for entry in SeqIO.parse(io.TextIOWrapper(fh), "gb"):
+        if root_taxon is None or root_taxon in entry.annotations["taxonomy"]:
+            yield entry
+
+
+def comparable(fields: dict) -> dict:
+    """Reduce parsed fields to plain values that can be compared."""
+    return {
+        key: value
+        for key, value in fields.items()
+        if key not in ("annotations", fields["organelle"])
+    }
+
+
+def run_parser(flatfile: str, args: argparse.Namespace, biopython: bool) -> tuple:
+    """Parse a flatfile with one of the parsers and time it."""
+    start = time.perf_counter()
+    if biopython:
+        with mock.patch.object(refseq, "scan_flatfile", biopython_records):
+            data = refseq.parse_flatfile(flatfile, args.organelle, args)
+    else:
+        data = refseq.parse_flatfile(flatfile, args.organelle, args)
+    elapsed = time.perf_counter() - start
+    annotations = [
+        {key: entry["annotations"].get(key) for key in ANNOTATION_KEYS}
+        for entry in data
+    ]
+    return [comparable(entry) for entry in data], annotations, elapsed
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("flatfile", help="Path to a *.genomic.gbff.gz file.")
+    parser.add_argument("-o", "--organelle", default="mitochondrion")
+    parser.add_argument("-r", "--root-taxon", default=None)
+    args = parser.parse_args()
+    args.log_interval = 60
+
+    scanned, scanned_annotations, scan_time = run_parser(args.flatfile, args, False)
+    parsed, parsed_annotations, bio_time = run_parser(args.flatfile, args, True)
+
+    mismatches = sum(
+        a != b
+        for a, b in zip(
+            zip(scanned, scanned_annotations), zip(parsed, parsed_annotations)
+        )
+    )
+    print(f"records:    {len(scanned)} scanned, {len(parsed)} with BioPython")
+    print(f"scanner:    {scan_time:.2f}s")
+    print(f"BioPython:  {bio_time:.2f}s")
+    print(f"speedup:    {bio_time / scan_time:.1f}x")
+    print(f"mismatches: {mismatches + abs(len(scanned) - len(parsed))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Compare whole-table regex replace and column-wise sheet cleanup.
+
+Builds a synthetic status sheet with blank, space-padded and placeholder cells,
+then cleans it with the chains of `DataFrame.replace` calls the status list,
+EBP and VGP cleanups used before and with `cleanup_values` from
+import_status_lib. Reports the time of each and checks that both give the same
+table and write the same TSV.
+
+Usage:
+    python scripts/benchmarks/benchmark_sheet_cleanup.py -n 100000
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import import_status_lib as isl  # noqa: E402
+
+VALUES = ["DTOL", " DTOL", "ERGA ", "  VGP  ", "-", "", "   ", "\t", " - "]
+STATUSES = isl.SEQUENCING_STATUSES + ["publication_available", "", " open"]
+
+
+def make_sheet(rows: int, seed: int = 1) -> pd.DataFrame:
+    """Build a synthetic sheet of text columns and a couple of numeric ones."""
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Genus species{i}" for i in range(rows)], dtype=object)
+    names[rng.random(rows) < 0.05] = " "
+    table = pd.DataFrame(
+        {
+            "#NCBI_taxon_id": [str(1000 + i) for i in range(rows)],
+            "species": names,
+            "sequencing_status": rng.choice(STATUSES, rows),
+            "empty": [""] * rows,
+        },
+        dtype=object,
+    )
+    for column in range(12):
+        values = rng.choice(VALUES, rows).astype(object)
+        values[rng.random(rows) < 0.3] = np.nan
+        table[f"column_{column}"] = values
+    table["length"] = rng.random(rows)
+    table["count"] = rng.integers(0, 100, rows)
+    return table
+
+
+def replace_status_list(table: pd.DataFrame) -> pd.DataFrame:
+    """Status list cleanup, as in import_status_lib.general_cleanup_for_table."""
+    table = table.replace(r"^\s*$", np.nan, regex=True)
+    return table.replace("publication_available", "published", regex=False)
+
+
+def replace_ebp(table: pd.DataFrame) -> pd.DataFrame:
+    """EBP cleanup, as in ebp_import/import_status_lib.general_cleanup_for_table."""
+    table = table.replace(r"^\s*$", np.nan, regex=True)
+    table = table.replace(r"^ +| +$", r"", regex=True)
+    table = table.replace("publication_available", "published", regex=False)
+    return table.replace("-", "", regex=False)
+
+
+def replace_vgp(table: pd.DataFrame) -> pd.DataFrame:
+    """VGP cleanup, nulling blank cells with None before stripping spaces."""
+    table = table.replace(r"^\s*$", None, regex=True)
+    return table.replace(r"^ +| +$", r"", regex=True)
+
+
+def cleanup_status_list(table: pd.DataFrame) -> pd.DataFrame:
+    return isl.cleanup_values(
+        table, replacements={"publication_available": "published"}
+    )
+
+
+def cleanup_ebp(table: pd.DataFrame) -> pd.DataFrame:
+    return isl.cleanup_values(
+        table,
+        strip_spaces=True,
+        replacements={"publication_available": "published", "-": ""},
+    )
+
+
+def cleanup_vgp(table: pd.DataFrame) -> pd.DataFrame:
+    return isl.cleanup_values(table, null=None, strip_spaces=True)
+
+
+def run(clean, sheet: pd.DataFrame) -> tuple:
+    """Clean a copy of the sheet and return the table, its TSV and elapsed time."""
+    table = sheet.copy()
+    start = time.perf_counter()
+    table = clean(table)
+    elapsed = time.perf_counter() - start
+    output = io.StringIO()
+    table.to_csv(output, sep="\t", index=False)
+    return table, output.getvalue(), elapsed
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-n", "--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    sheet = make_sheet(args.rows)
+    mismatches = 0
+    for label, old_clean, new_clean in (
+        ("status list", replace_status_list, cleanup_status_list),
+        ("ebp", replace_ebp, cleanup_ebp),
+        ("vgp", replace_vgp, cleanup_vgp),
+    ):
+        old_table, old, old_time = run(old_clean, sheet)
+        new_table, new, new_time = run(new_clean, sheet)
+        try:
+            pd.testing.assert_frame_equal(old_table, new_table, check_dtype=False)
+        except AssertionError:
+            mismatches += 1
+        mismatches += int(old != new)
+        print(
+            f"{label}: replace {old_time:.3f}s, column-wise {new_time:.3f}s,"
+            f" speedup {old_time / new_time:.1f}x"
+        )
+    print(f"rows:       {args.rows}")
+    print("mismatches:", mismatches)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Compare object and categorical status columns in a merged status table.
+
+Builds a synthetic expanded status list for each project, fills the sequencing
+status columns with import_status_lib, then merges them into one table twice:
+with plain object columns and `pd.concat`, and with the status columns stored as
+categoricals and `concat_status_tables`. Reports the memory of each merged
+table and the time to select the rows each project has marked in every status
+column, and checks that both write the same TSV.
+
+Usage:
+    python scripts/benchmarks/benchmark_status_categoricals.py -n 20000 -p 26
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import import_status_lib as isl  # noqa: E402
+
+TARGETS = ["long_list", "family_representative", "other_priority"]
+
+
+def make_project(acronym: str, rows: int, seed: int) -> pd.DataFrame:
+    """Build a synthetic expanded status list for one project."""
+    rng = np.random.default_rng(seed)
+    table = pd.DataFrame(
+        {
+            "ncbi_taxon_id": [str(1000 + i) for i in range(rows)],
+            "species": [f"Genus species{i}" for i in range(rows)],
+            "family": rng.choice([f"Family{i}" for i in range(200)], rows),
+            "target_list_status": rng.choice(TARGETS, rows),
+            "sequencing_status": rng.choice(isl.SEQUENCING_STATUSES + [np.nan], rows),
+            "project": acronym,
+        },
+        dtype=object,
+    )
+    table["long_list"] = acronym
+    for target in TARGETS[1:]:
+        table[target] = np.where(table["target_list_status"] == target, acronym, None)
+    return isl.fill_sequencing_status(table, acronym)
+
+
+def select_marked(table: pd.DataFrame, acronyms: list) -> int:
+    """Select the rows each project has marked in every status column."""
+    rows = 0
+    for column in TARGETS + isl.SEQUENCING_STATUSES:
+        for acronym in acronyms:
+            rows += len(table.loc[table[column] == acronym, "ncbi_taxon_id"])
+    return rows
+
+
+def measure(table: pd.DataFrame, acronyms: list) -> tuple:
+    """Return the memory, selection time and selected rows for a merged table."""
+    memory = table.memory_usage(deep=True)
+    status_memory = memory[[c for c in isl.STATUS_COLUMNS if c in table]].sum()
+    start = time.perf_counter()
+    rows = select_marked(table, acronyms)
+    elapsed = time.perf_counter() - start
+    return memory.sum(), status_memory, elapsed, rows
+
+
+def to_tsv(table: pd.DataFrame) -> str:
+    output = io.StringIO()
+    table.to_csv(output, sep="\t", index=False)
+    return output.getvalue()
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-n", "--rows", type=int, default=20000)
+    parser.add_argument("-p", "--projects", type=int, default=26)
+    args = parser.parse_args()
+
+    acronyms = [f"P{i:02d}" for i in range(args.projects)]
+    tables = [
+        make_project(acronym, args.rows, seed) for seed, acronym in enumerate(acronyms)
+    ]
+    merged = pd.concat(tables, ignore_index=True)
+    start = time.perf_counter()
+    categorical = isl.concat_status_tables(
+        [isl.categorize_status_columns(table.copy()) for table in tables]
+    )
+    convert_time = time.perf_counter() - start
+
+    old = measure(merged, acronyms)
+    new = measure(categorical, acronyms)
+    mismatches = int(to_tsv(merged) != to_tsv(categorical)) + int(old[3] != new[3])
+    print(f"memory:     object {old[0] / 1e6:.1f}MB, categorical {new[0] / 1e6:.1f}MB")
+    print(
+        f"status columns: object {old[1] / 1e6:.1f}MB,"
+        f" categorical {new[1] / 1e6:.1f}MB, {old[1] / new[1]:.0f}x smaller"
+    )
+    print(
+        f"selection:  object {old[2]:.3f}s, categorical {new[2]:.3f}s,"
+        f" speedup {old[2] / new[2]:.1f}x"
+    )
+    print(f"categorize and merge: {convert_time:.3f}s")
+    print(f"rows:       {len(merged)}")
+    print("mismatches:", mismatches)
+
+
+if __name__ == "__main__":
+    main()
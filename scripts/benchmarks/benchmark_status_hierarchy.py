@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Compare step-by-step and vectorised sequencing status expansion.
+
+Builds a synthetic status sheet, then fills the status columns with the `.loc`
+assignments the status list, VGP and CANBP curation used before and with the
+shared status engine in import_status_lib. Reports the time of each and checks
+that both write the same TSV, for a single project acronym and for per-row
+project values as used by the VGP curation.
+
+Usage:
+    python scripts/benchmarks/benchmark_status_hierarchy.py -n 100000
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import import_status_lib as isl  # noqa: E402
+
+STATUSES = isl.SEQUENCING_STATUSES
+
+PROJECTS = ["DTOL", "ERGA", "VGP", "DTOL,VGP", "CANBP"]
+
+
+def make_sheet(rows: int, seed: int = 1) -> pd.DataFrame:
+    """Build a synthetic sheet with some status columns already filled in."""
+    rng = np.random.default_rng(seed)
+    table = pd.DataFrame(
+        {
+            "ncbi_taxon_id": [str(1000 + i) for i in range(rows)],
+            "species": [f"Genus species{i}" for i in range(rows)],
+            "sequencing_status": rng.choice(STATUSES + ["", "unknown"], rows),
+            "all_projects": rng.choice(PROJECTS, rows),
+        },
+        dtype=object,
+    )
+    for status in ("open", "in_assembly"):
+        filled = rng.random(rows) < 0.05
+        table[status] = np.where(filled, rng.choice(PROJECTS, rows), None)
+    return table
+
+
+def loc_expand(table: pd.DataFrame, value, hierarchy: list) -> pd.DataFrame:
+    """Fill status columns one `.loc` assignment at a time."""
+    for item in STATUSES:
+        if item not in table:
+            table[item] = pd.Series(np.nan, index=table.index, dtype=object)
+    for item in STATUSES:
+        table.loc[table["sequencing_status"] == item, item] = value
+    for status, implies in hierarchy:
+        table.loc[table[status] == value, implies] = value
+    return table
+
+
+def engine_expand(table: pd.DataFrame, value, hierarchy: list) -> pd.DataFrame:
+    """Fill status columns with the shared status engine."""
+    for item in STATUSES:
+        if item not in table:
+            table[item] = pd.Series(np.nan, index=table.index, dtype=object)
+    return isl.fill_status_columns(table, value, hierarchy, STATUSES)
+
+
+def run(expand, sheet: pd.DataFrame, per_row: bool, hierarchy: list) -> tuple:
+    """Expand a copy of the sheet and return the TSV and elapsed time."""
+    table = sheet.copy()
+    value = table["all_projects"] if per_row else "DTOL"
+    start = time.perf_counter()
+    table = expand(table, value, hierarchy)
+    elapsed = time.perf_counter() - start
+    output = io.StringIO()
+    table.to_csv(output, sep="\t", index=False)
+    return output.getvalue(), elapsed
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-n", "--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    sheet = make_sheet(args.rows)
+    vgp_hierarchy = (
+        isl.SEQUENCING_STATUS_HIERARCHY[:5]
+        + [("in_progress", "data_generation")]
+        + isl.SEQUENCING_STATUS_HIERARCHY[5:]
+    )
+    mismatches = 0
+    for label, per_row, hierarchy in (
+        ("acronym", False, isl.SEQUENCING_STATUS_HIERARCHY),
+        ("per-row", True, vgp_hierarchy),
+    ):
+        old, old_time = run(loc_expand, sheet, per_row, hierarchy)
+        new, new_time = run(engine_expand, sheet, per_row, hierarchy)
+        mismatches += int(old != new)
+        print(
+            f"{label}: .loc {old_time:.3f}s, engine {new_time:.3f}s,"
+            f" speedup {old_time / new_time:.1f}x"
+        )
+    print(f"rows:       {args.rows}")
+    print("mismatches:", mismatches)
+
+
+if __name__ == "__main__":
+    main()
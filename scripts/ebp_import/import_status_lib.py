@@ -3,11 +3,23 @@ DO NOT MODIFY THIS FILE!
 This is a COPY of the library of functions to import and process status spreadsheets for the GoaT project.
 Add changes to goat-data/scripts/import_status_lib.py, then copy the file to this location.'''
 
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import urllib.error
+import urllib.request
+
 import numpy as np
 import pandas as pd
 # import ssl
 from datetime import datetime
 
+# keep snapshots of each sheet here so unchanged sheets can skip processing
+SNAPSHOT_DIR = os.getenv("STATUS_SNAPSHOT_DIR")
+
 def open_private_tsv(private_link_token):
     private_tsv = pd.read_csv(private_link_token
                              ,delimiter="\t"
@@ -25,15 +37,116 @@ def open_public_tsv(public_url):
                              )
     return public_tsv
 
-def open_google_spreadsheet(acronym, file_link, header_index):
-    project_table = pd.read_csv(file_link,
+def fetch_spreadsheet(file_link):
+    # download the sheet once, the raw bytes can be reused for caching and diffing
+    if os.path.exists(file_link):
+        with open(file_link, "rb") as file:
+            return file.read()
+    with urllib.request.urlopen(file_link) as response:
+        return response.read()
+
+def decode_spreadsheet(raw):
+    # ISO-8859-1 (latin1) can decode any bytes, so is the fallback for non UTF-8
+    try:
+        return raw.decode("utf-8-sig"), "utf-8"
+    except UnicodeDecodeError:
+        print("Failed to open file with utf-8 encoding. Trying ISO-8859-1...")
+        return raw.decode("ISO-8859-1"), "ISO-8859-1"
+
+def open_google_spreadsheet(acronym, file_link, header_index, raw=None):
+    if raw is None:
+        raw = fetch_spreadsheet(file_link)
+    text, encoding = decode_spreadsheet(raw)
+    project_table = pd.read_csv(io.StringIO(text),
                     # Set first column as rownames in data frame
-                    delimiter="\t", header=header_index, dtype=object, encoding='utf-8',
+                    delimiter="\t", header=header_index, dtype=object,
                     )
     project_table.rename(columns={'#NCBI_taxon_id':'NCBI_taxon_id'}, inplace=True)
     project_table["project"] = acronym.upper()
     return project_table
 
+# Snapshot cache for published sheets
+# each sheet keeps its raw bytes, validators, content hash and the expanded tsv
+# made from it, so a sheet that has not changed can skip all processing
+
+def source_hash(*paths):
+    # hash the processing code too, so changes to it invalidate the snapshots
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+def load_snapshot(snapshot_dir, name):
+    try:
+        with open(f"{snapshot_dir}/{name}.json") as file:
+            snapshot = json.load(file)
+        with open(f"{snapshot_dir}/{name}.raw", "rb") as file:
+            snapshot["raw"] = file.read()
+    except (OSError, ValueError):
+        return None
+    if not os.path.exists(f"{snapshot_dir}/{name}.tsv"):
+        return None
+    return snapshot
+
+def fetch_snapshot(file_link, snapshot=None):
+    # conditional GET, a 304 response reuses the raw bytes from the snapshot
+    if os.path.exists(file_link):
+        return fetch_spreadsheet(file_link), {}
+    validators = snapshot["validators"] if snapshot else {}
+    request = urllib.request.Request(file_link)
+    if "etag" in validators:
+        request.add_header("If-None-Match", validators["etag"])
+    if "last_modified" in validators:
+        request.add_header("If-Modified-Since", validators["last_modified"])
+    try:
+        with urllib.request.urlopen(request) as response:
+            raw = response.read()
+            headers = response.headers
+    except urllib.error.HTTPError as err:
+        if err.code == 304 and snapshot:
+            return snapshot["raw"], validators
+        raise
+    return raw, {
+        key: headers[header]
+        for key, header in (("etag", "ETag"), ("last_modified", "Last-Modified"))
+        if header in headers
+    }
+
+def check_snapshot(snapshot_dir, name, file_link, options=""):
+    # returns the raw sheet, its new snapshot and whether the old one still holds
+    snapshot = load_snapshot(snapshot_dir, name) if snapshot_dir else None
+    raw, validators = fetch_snapshot(file_link, snapshot)
+    updated = {
+        "validators": validators,
+        "sha256": hashlib.sha256(raw).hexdigest(),
+        "options": options,
+        "raw": raw,
+    }
+    unchanged = snapshot is not None and all(
+        snapshot.get(key) == updated[key] for key in ("sha256", "options")
+    )
+    return raw, updated, unchanged
+
+def save_snapshot(snapshot_dir, name, snapshot, file_name):
+    # the json is written last, so an interrupted save leaves no valid snapshot
+    os.makedirs(snapshot_dir, exist_ok=True)
+    path = f"{snapshot_dir}/{name}"
+    if os.path.exists(f"{path}.json"):
+        os.remove(f"{path}.json")
+    shutil.copyfile(file_name, f"{path}.tsv.tmp")
+    os.replace(f"{path}.tsv.tmp", f"{path}.tsv")
+    with open(f"{path}.raw.tmp", "wb") as file:
+        file.write(snapshot["raw"])
+    os.replace(f"{path}.raw.tmp", f"{path}.raw")
+    meta = {key: value for key, value in snapshot.items() if key != "raw"}
+    with open(f"{path}.json.tmp", "w") as file:
+        json.dump(meta, file)
+    os.replace(f"{path}.json.tmp", f"{path}.json")
+
+def restore_snapshot(snapshot_dir, name, file_name):
+    shutil.copyfile(f"{snapshot_dir}/{name}.tsv", file_name)
+
 def open_source_csv(acronym, file_link, header_index):
     project_table = pd.read_csv(file_link,
                     # Set first column as rownames in data frame
@@ -45,11 +158,50 @@ def open_source_csv(acronym, file_link, header_index):
     return project_table
 
 
+SURROUNDING_SPACES = re.compile(r"^ +| +$")
+
+def cleanup_values(project_table, null=np.nan, null_blanks=True, strip_spaces=False, replacements=None):
+    '''
+    Nulls blank cells, optionally strips leading and trailing spaces and swaps
+    exact values, in that order, in a single pass over the text columns.
+    Same result as successive whole-table replace calls, but other columns are
+    left alone and each distinct value in a column is only cleaned once.
+    Set null_blanks to False to only strip and replace.
+    '''
+    replacements = list((replacements or {}).items())
+    def clean(value):
+        if not isinstance(value, str):
+            return value
+        if null_blanks and (not value or value.isspace()):
+            return null
+        if strip_spaces:
+            value = SURROUNDING_SPACES.sub("", value)
+        for old, new in replacements:
+            if value == old:
+                value = new
+        return value
+    def clean_column(values):
+        if pd.api.types.infer_dtype(values, skipna=True) != "string":
+            # empty or mixed columns are cleaned cell by cell
+            return np.array([clean(value) for value in values], dtype=object)
+        codes, uniques = pd.factorize(values)
+        cleaned = np.array([clean(value) for value in uniques] + [None], dtype=object)
+        column = cleaned[codes]
+        missing = codes < 0
+        column[missing] = values[missing]
+        return column
+    columns = {}
+    for position in range(project_table.shape[1]):
+        column = project_table.iloc[:, position]
+        if column.dtype == object or isinstance(column.dtype, pd.StringDtype):
+            column = pd.Series(clean_column(column.to_numpy()), index=column.index, dtype=column.dtype)
+        columns[position] = column
+    cleaned_table = pd.DataFrame(columns)
+    cleaned_table.columns = project_table.columns
+    return cleaned_table
+
 def general_cleanup_for_table(project_table):
-    project_table = project_table.replace(r'^\s*$', np.nan, regex=True)
-    project_table = project_table.replace(r"^ +| +$", r"", regex=True)
-    project_table = project_table.replace("publication_available", "published", regex=False)
-    project_table = project_table.replace("-","", regex=False)
+    project_table = cleanup_values(project_table, strip_spaces=True, replacements={"publication_available": "published", "-": ""})
     project_table.dropna(how="all", axis=1, inplace=True)
     project_table.dropna(how="all", axis=0, inplace=True)
     project_table.rename(columns={'#NCBI_taxon_id':'NCBI_taxon_id'}, inplace=True)
@@ -116,26 +268,140 @@ def remove_acronym_prefix(project_table):
 
 # Expand sequencing status into columns:
 
+SEQUENCING_STATUSES = [
+    "sample_collected",
+    "sample_acquired",
+    "in_progress",
+    "data_generation",
+    "in_assembly",
+    "insdc_submitted",
+    "open",
+    "insdc_open",
+    "published",
+]
+
+# Each step marks the second status wherever the first one is marked, in order.
+# Statuses further down the list are implied by those above them.
+SEQUENCING_STATUS_HIERARCHY = [
+    ("published", "insdc_open"),
+    ("insdc_open", "open"),
+    ("open", "in_progress"),
+    ("data_generation", "in_progress"),
+    ("in_assembly", "in_progress"),
+    ("in_progress", "sample_acquired"),
+    ("sample_acquired", "sample_collected"),
+]
+
+def status_values(value):
+    # value can be one acronym for the whole table or a column of per-row values
+    if np.ndim(value) == 0:
+        return value
+    return np.asarray(value, dtype=object)
+
+def status_implications(statuses, hierarchy):
+    # run the hierarchy steps on each status alone to find every status it implies
+    index = {status: i for i, status in enumerate(statuses)}
+    implied = np.eye(len(statuses), dtype=bool)
+    for status, implies in hierarchy:
+        implied[:, index[implies]] |= implied[:, index[status]]
+    return implied
+
+def fill_status_columns(
+    project_table, value, hierarchy=SEQUENCING_STATUS_HIERARCHY, statuses=None
+):
+    # Same result as setting each of statuses to value where the sequencing_status
+    # names it, then applying each hierarchy step in turn as a .loc assignment.
+    # The sequencing_status is mapped to a rank in statuses, every implied status
+    # is found in one matrix product and each column is written at most once.
+    statuses = statuses or []
+    columns = list(
+        dict.fromkeys(statuses + [status for step in hierarchy for status in step])
+    )
+    values = status_values(value)
+    current = np.column_stack(
+        [(project_table[column] == values).to_numpy() for column in columns]
+    )
+    marked = current.copy()
+    if statuses:
+        ranks = pd.Categorical(project_table["sequencing_status"], categories=statuses)
+        marked[:, : len(statuses)] |= ranks.codes[:, None] == np.arange(len(statuses))
+    implied = status_implications(columns, hierarchy).astype(np.int32)
+    mask = (marked.astype(np.int32) @ implied > 0) & ~current
+    for column, column_mask in zip(columns, mask.T):
+        if column_mask.any():
+            filled = project_table[column].to_numpy(dtype=object, copy=True)
+            filled[column_mask] = (
+                values if np.ndim(values) == 0 else values[column_mask]
+            )
+            if isinstance(project_table[column].dtype, pd.CategoricalDtype):
+                filled = pd.Categorical(filled)
+            project_table[column] = filled
+    return project_table
+
 def create_status_column(project_table, acronym):
-    possible_seq_status = ["sample_collected","sample_acquired","in_progress","data_generation","in_assembly","insdc_submitted","open","insdc_open","published"]
-    for item in possible_seq_status:   
+    for item in SEQUENCING_STATUSES:
         if item not in project_table:
             project_table[item] = np.nan
-    #return project_table
-    for item in possible_seq_status:        
-        project_table.loc[project_table['sequencing_status'] == item.lower(), item] = acronym
-    return project_table
+    return fill_status_columns(project_table, acronym, [], SEQUENCING_STATUSES)
 
 def expand_sequencing_status(project_table, acronym):
-    project_table.loc[project_table["published"] == acronym, "insdc_open"] = acronym
-    project_table.loc[project_table['insdc_open'] == acronym, 'open'] = acronym
-    project_table.loc[project_table['open'] == acronym, 'in_progress'] = acronym
-    project_table.loc[project_table['data_generation'] == acronym, 'in_progress'] = acronym
-    project_table.loc[project_table['in_assembly'] == acronym, 'in_progress'] = acronym
-    project_table.loc[project_table['in_progress'] == acronym, 'sample_acquired'] = acronym
-    project_table.loc[project_table['sample_acquired'] == acronym, 'sample_collected'] = acronym
+    return fill_status_columns(project_table, acronym)
+
+def fill_sequencing_status(project_table, acronym):
+    # create_status_column and expand_sequencing_status in a single pass
+    for item in SEQUENCING_STATUSES:
+        if item not in project_table:
+            project_table[item] = np.nan
+    return fill_status_columns(
+        project_table, acronym, SEQUENCING_STATUS_HIERARCHY, SEQUENCING_STATUSES
+    )
+
+# Store low-cardinality columns as categoricals:
+# columns that each hold one of a few acronyms or statuses, or are empty
+STATUS_COLUMNS = [
+    "project",
+    "target_list_status",
+    "sequencing_status",
+    "long_list",
+    "family_representative",
+    "other_priority",
+] + SEQUENCING_STATUSES
+
+def categorize_status_columns(project_table, columns=STATUS_COLUMNS):
+    # each distinct value is stored once and rows only hold a small integer code,
+    # which makes comparisons cheap and writes the same TSV as object columns
+    for column in columns:
+        if column in project_table and not isinstance(project_table[column].dtype, pd.CategoricalDtype):
+            # go through object so empty columns get object, not float, categories
+            project_table[column] = project_table[column].astype(object).astype("category")
     return project_table
 
+def concat_status_tables(tables):
+    # pd.concat turns categorical columns back into object columns unless every
+    # table has them with the same categories, so give them the union first
+    tables = [table.copy(deep=False) for table in tables]
+    columns = list(dict.fromkeys(
+        column for table in tables
+        for column, dtype in table.dtypes.items()
+        if isinstance(dtype, pd.CategoricalDtype)
+    ))
+    for column in columns:
+        categories = set()
+        for table in tables:
+            if column in table:
+                categories.update(table[column].dropna().unique())
+        dtype = pd.CategoricalDtype(sorted(categories, key=str))
+        for table in tables:
+            if column in table:
+                table[column] = table[column].astype(dtype)
+            else:
+                table[column] = pd.Categorical([np.nan] * len(table), dtype=dtype)
+    return pd.concat(tables, ignore_index=True)
+
+def read_expanded_tsv(file_name, columns=STATUS_COLUMNS):
+    project_table = pd.read_csv(file_name, sep="\t", dtype=object)
+    return categorize_status_columns(project_table, columns)
+
 def create_mandatory_columns(project_table, acronym):
     mandatory_fields = [
         "ncbi_taxon_id",
@@ -161,21 +427,30 @@ def export_expanded_tsv(project_table, acronym):
 # Putting all together for standard GoaT spreadsheets
 import import_status_lib as isl
 
-def processing_schema_2_5_lists(acronym,url,start_row):
+def processing_schema_2_5_lists(acronym,url,start_row,snapshot_dir=SNAPSHOT_DIR):
     print(f'opening {acronym} url ...')
-    project_table = isl.open_google_spreadsheet(acronym,url,start_row)
+    file_name = acronym + '_expanded.tsv'
+    raw, snapshot, unchanged = isl.check_snapshot(snapshot_dir, acronym, url,
+                                                  options=f'{start_row} {isl.source_hash(isl.__file__)}')
+    if unchanged:
+        print(f'{acronym} is unchanged, reusing the snapshot')
+        isl.restore_snapshot(snapshot_dir, acronym, file_name)
+        return
+    project_table = isl.open_google_spreadsheet(acronym,url,start_row,raw=raw)
     print(f'cleaning up {acronym} table ...')
     project_table = isl.general_cleanup_for_table(project_table)
     project_table = isl.cleanup_headers_specific_units(project_table)
     print(f'expanding {acronym} target status ...')
     project_table = isl.expand_target_status(project_table, acronym)
-    project_table = isl.create_status_column(project_table, acronym)
     print(f'expanding {acronym} sequencing status ...')
-    project_table = isl.expand_sequencing_status(project_table, acronym)
+    project_table = isl.fill_sequencing_status(project_table, acronym)
     print(f'creating {acronym} mandatory fields ...')
     project_table = isl.create_mandatory_columns(project_table, acronym)
+    project_table = isl.categorize_status_columns(project_table)
     print(f'saving {acronym} to file')
     isl.export_expanded_tsv(project_table, acronym)
+    if snapshot_dir:
+        isl.save_snapshot(snapshot_dir, acronym, snapshot, file_name)
 
 
 # Putting all together for standard GoaT spreadsheets
@@ -189,9 +464,9 @@ def processing_csv_lists(acronym,url,start_row):
     project_table = isl.cleanup_headers_specific_units(project_table)
     print(f'expanding {acronym} target status ...')
     project_table = isl.expand_target_status(project_table, acronym)
-    project_table = isl.create_status_column(project_table, acronym)
     print(f'expanding {acronym} sequencing status ...')
-    project_table = isl.expand_sequencing_status(project_table, acronym)
+    project_table = isl.fill_sequencing_status(project_table, acronym)
+    project_table = isl.categorize_status_columns(project_table)
     print(f'saving {acronym} to file')
     isl.export_expanded_tsv(project_table, acronym)
 
@@ -0,0 +1,367 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+description: run the sheet curations defined in curation_pipelines.yaml
+
+Each pipeline is compiled into a list of vectorised pandas steps before any
+sheet is fetched, so a mistake in the spec fails fast. Pipelines are
+independent, so they are fetched and processed in parallel. A sheet that has
+not changed since its last run (same content, spec and code) is not processed
+again, its previous output is restored from the snapshot cache instead.
+
+usage: python run_curations.py [-c curation_pipelines.yaml] [-o .] [VGP CANBP ...]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import yaml
+
+import import_status_lib as isl
+
+PIPELINES = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "curation_pipelines.yaml"
+)
+
+
+def general_cleanup(enabled):
+    return isl.general_cleanup_for_table
+
+
+def clean_headers(enabled):
+    return isl.cleanup_headers_specific_units
+
+
+def snake_case_headers(enabled):
+    # unlike clean_headers, this also removes parentheses from the headers
+    def step(table):
+        table.columns = (
+            table.columns.str.replace(" ", "_")
+            .str.replace(r"[()]", "", regex=True)
+            .str.lower()
+        )
+        return table
+
+    return step
+
+
+def null_empty(value):
+    replacement = {"nan": np.nan, "none": None}[value]
+    return lambda table: isl.cleanup_values(table, null=replacement)
+
+
+def strip_spaces(enabled):
+    return lambda table: isl.cleanup_values(table, null_blanks=False, strip_spaces=True)
+
+
+def cleanup(spec):
+    # null_empty and strip_spaces in a single pass over the sheet
+    replacement = {"nan": np.nan, "none": None}[spec.get("null_empty", "nan")]
+    return lambda table: isl.cleanup_values(
+        table, null=replacement, strip_spaces=spec.get("strip_spaces", False)
+    )
+
+
+def drop_empty(enabled):
+    def step(table):
+        table = table.dropna(how="all", axis=1)
+        return table.dropna(how="all", axis=0)
+
+    return step
+
+
+def drop_rows(spec):
+    column, values = spec["column"], spec.get("values", [])
+
+    def step(table):
+        keep = table[column].notna() & ~table[column].isin(values)
+        return table.drop(table.index[~keep.to_numpy()])
+
+    return step
+
+
+def constant(columns):
+    def step(table):
+        for column, value in columns.items():
+            table[column] = value
+        return table
+
+    return step
+
+
+def copy(columns):
+    def step(table):
+        for column, source in columns.items():
+            table[column] = table[source]
+        return table
+
+    return step
+
+
+def lower(columns):
+    def step(table):
+        for column in columns:
+            table[column] = table[column].str.lower()
+        return table
+
+    return step
+
+
+def translate(spec):
+    # values not listed are kept as they are
+    columns, values = spec["columns"], spec["values"]
+
+    def step(table):
+        for column in columns:
+            listed = table[column].isin(values.keys())
+            table[column] = table[column].where(~listed, table[column].map(values))
+        return table
+
+    return step
+
+
+def map_values(spec):
+    # values not listed become empty
+    column, source, values = spec["column"], spec["from"], spec["values"]
+
+    def step(table):
+        table[column] = table[source].map(values)
+        return table
+
+    return step
+
+
+def flag_any(spec):
+    column, value, where = spec["column"], spec["value"], spec["where"]
+
+    def step(table):
+        mask = np.logical_or.reduce(
+            [(table[source] == match).to_numpy() for source, match in where.items()]
+        )
+        if column in table:
+            flagged = table[column].to_numpy(dtype=object, copy=True)
+        else:
+            flagged = np.full(len(table), np.nan, dtype=object)
+        flagged[mask] = value
+        table[column] = flagged
+        return table
+
+    return step
+
+
+def join_unique(spec):
+    # join each distinct combination of values once, then map it back to the rows
+    column, sources = spec["column"], spec["from"]
+
+    def step(table):
+        frame = table[sources]
+        groups = frame.groupby(sources, dropna=False, sort=False).ngroup().to_numpy()
+        joined = [
+            ",".join(sorted(set(value for value in row if pd.notna(value))))
+            for row in frame.drop_duplicates().itertuples(index=False)
+        ]
+        table[column] = np.array(joined, dtype=object)[groups]
+        return table
+
+    return step
+
+
+def status_columns(columns):
+    def step(table):
+        for column in columns:
+            if column not in table:
+                table[column] = np.nan
+        return table
+
+    return step
+
+
+def fill_status(spec):
+    statuses = spec.get("statuses", isl.SEQUENCING_STATUSES)
+    hierarchy = [
+        tuple(step) for step in spec.get("hierarchy", isl.SEQUENCING_STATUS_HIERARCHY)
+    ]
+    # check the hierarchy now rather than after the sheet has been fetched
+    isl.status_implications(
+        list(dict.fromkeys(statuses + [s for step in hierarchy for s in step])),
+        hierarchy,
+    )
+
+    def step(table):
+        value = table[spec["value_from"]] if "value_from" in spec else spec["value"]
+        return isl.fill_status_columns(table, value, hierarchy, statuses)
+
+    return step
+
+
+def show_unique(columns):
+    def step(table):
+        for column in columns:
+            print(column, table[column].unique())
+        return table
+
+    return step
+
+
+STEPS = {
+    "general_cleanup": general_cleanup,
+    "clean_headers": clean_headers,
+    "snake_case_headers": snake_case_headers,
+    "null_empty": null_empty,
+    "strip_spaces": strip_spaces,
+    "cleanup": cleanup,
+    "drop_empty": drop_empty,
+    "drop_rows": drop_rows,
+    "constant": constant,
+    "copy": copy,
+    "lower": lower,
+    "translate": translate,
+    "map": map_values,
+    "flag_any": flag_any,
+    "join_unique": join_unique,
+    "status_columns": status_columns,
+    "fill_status": fill_status,
+    "show_unique": show_unique,
+}
+
+
+def load_pipelines(file_path):
+    with open(file_path) as file:
+        return yaml.safe_load(file)["pipelines"]
+
+
+def compile_pipeline(name, pipeline):
+    """
+    Compiles the steps of a pipeline spec into a list of functions that each
+    take and return a DataFrame.
+
+    Raises:
+        ValueError: If a step is not a single known step name.
+    """
+    steps = []
+    for entry in pipeline.get("steps", []):
+        if not isinstance(entry, dict) or len(entry) != 1:
+            raise ValueError(f"{name}: each step must have a single name, got {entry}")
+        ((step, spec),) = entry.items()
+        if step not in STEPS:
+            raise ValueError(f"{name}: unknown step '{step}'")
+        steps.append(STEPS[step](spec))
+    return steps
+
+
+def read_sheet(pipeline, raw):
+    if "acronym" in pipeline:
+        return isl.open_google_spreadsheet(
+            pipeline["acronym"], pipeline["url"], pipeline.get("header", 0), raw=raw
+        )
+    return pd.read_csv(
+        io.BytesIO(raw), sep="\t", dtype=object, **pipeline.get("read", {})
+    )
+
+
+def run_pipeline(name, pipeline, output_dir, snapshot_dir):
+    """
+    Runs one pipeline, reusing the previous output if the sheet, the spec and
+    the code are unchanged. Returns whether it succeeded and the captured log.
+    """
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        try:
+            steps = compile_pipeline(name, pipeline)
+            file_name = os.path.join(output_dir, pipeline["output"])
+            options = json.dumps(pipeline, sort_keys=True) + isl.source_hash(
+                __file__, isl.__file__
+            )
+            print(f"opening {name} url ...")
+            raw, snapshot, unchanged = isl.check_snapshot(
+                snapshot_dir, name, pipeline["url"], options=options
+            )
+            if unchanged:
+                output = pipeline["output"]
+                print(f"{name} is unchanged, reusing {output} from the snapshot")
+                isl.restore_snapshot(snapshot_dir, name, file_name)
+                return True, log.getvalue()
+            table = read_sheet(pipeline, raw)
+            print(f"curating {name} ...")
+            for step in steps:
+                table = step(table)
+            print(f"saving {name} to {file_name}")
+            table.to_csv(file_name, sep="\t", index=False)
+            isl.save_snapshot(snapshot_dir, name, snapshot, file_name)
+            success = True
+        except Exception as err:
+            print(f"something has gone wrong with {name}: {err!r}")
+            success = False
+    return success, log.getvalue()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run EBP sheet curation pipelines")
+    parser.add_argument(
+        "names", nargs="*", help="pipelines to run, all if none are given"
+    )
+    parser.add_argument(
+        "-c", "--config", default=PIPELINES, help="pipeline spec YAML file"
+    )
+    parser.add_argument(
+        "-o", "--output-dir", default=".", help="directory for output files"
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=4,
+        help="number of sheets to process at once",
+    )
+    parser.add_argument(
+        "--snapshot-dir",
+        default=isl.SNAPSHOT_DIR or "snapshots",
+        help="directory for sheet snapshots"
+        " (default $STATUS_SNAPSHOT_DIR or ./snapshots)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    pipelines = load_pipelines(args.config)
+    names = args.names or list(pipelines)
+    for name in names:
+        if name not in pipelines:
+            sys.exit(f"unknown pipeline '{name}', choose from {', '.join(pipelines)}")
+        # compile everything up front so that a bad spec fails before any fetch
+        compile_pipeline(name, pipelines[name])
+    os.makedirs(args.output_dir, exist_ok=True)
+    failed = []
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [
+            (
+                name,
+                executor.submit(
+                    run_pipeline,
+                    name,
+                    pipelines[name],
+                    args.output_dir,
+                    args.snapshot_dir,
+                ),
+            )
+            for name in names
+        ]
+        for name, future in futures:
+            success, log = future.result()
+            print(log, end="", flush=True)
+            if not success:
+                failed.append(name)
+    if failed:
+        sys.exit(f"failed pipelines: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
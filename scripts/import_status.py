@@ -1,5 +1,9 @@
-import import_status_lib as isl
+import contextlib
+import io
 import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import import_status_lib as isl
 
 # from imp import reload
 # reload(isl)
@@ -33,34 +37,59 @@ projects = [
     "YGG",
 ]
 
-try:
-    private_tsv = isl.open_private_tsv(sys.argv[2])
-    private_tsv = (
-        private_tsv.reset_index()
-    )  # make sure indexes pair with number of rows
+# number of project sheets to fetch and process at once, can be set as argv[3]
+workers = 8
+
 
-    for index, row in private_tsv.iterrows():
-        print(
-            row["project_acronym"],
-            int(row["start_header_line"]),
-        )
+def process_project(acronym, url, start_row, dir):
+    # capture the log for each project so it can be printed in order
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        print(acronym, start_row)
         try:
-            isl.processing_schema_2_5_lists(
-                row["project_acronym"],
-                str(row["published_url"]),
-                int(row["start_header_line"]),
-                sys.argv[1],
-            )
+            isl.processing_schema_2_5_lists(acronym, url, start_row, dir)
+            success = True
         except Exception:
-            print("something has gone wrong: ", row["project_acronym"])
+            print("something has gone wrong: ", acronym)
+            success = False
+    return success, log.getvalue()
+
+
+if __name__ == "__main__":
+    try:
+        private_tsv = isl.open_private_tsv(sys.argv[2])
+        private_tsv = (
+            private_tsv.reset_index()
+        )  # make sure indexes pair with number of rows
+        if len(sys.argv) > 3:
+            workers = int(sys.argv[3])
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                (
+                    row["project_acronym"],
+                    executor.submit(
+                        process_project,
+                        row["project_acronym"],
+                        str(row["published_url"]),
+                        int(row["start_header_line"]),
+                        sys.argv[1],
+                    ),
+                )
+                for index, row in private_tsv.iterrows()
+            ]
+            for acronym, future in futures:
+                success, log = future.result()
+                print(log, end="", flush=True)
+                if not success:
+                    try:
+                        open(f"{sys.argv[1]}/{acronym}_expanded.tsv.failed", "x")
+                    except FileExistsError:
+                        sys.exit(1)
+    except Exception:
+        for project in projects:
             try:
-                open(f"{sys.argv[1]}/{row['project_acronym']}_expanded.tsv.failed", "x")
+                open(f"{sys.argv[1]}/{project}_expanded.tsv.failed", "x")
+                pass
             except FileExistsError:
                 sys.exit(1)
-except Exception:
-    for project in projects:
-        try:
-            open(f"{sys.argv[1]}/{project}_expanded.tsv.failed", "x")
-            pass
-        except FileExistsError:
-            sys.exit(1)
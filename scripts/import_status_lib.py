@@ -1,6 +1,18 @@
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import urllib.error
+import urllib.request
+
 import numpy as np
 import pandas as pd
 
+# keep snapshots of each sheet here so unchanged sheets can skip processing
+SNAPSHOT_DIR = os.getenv("STATUS_SNAPSHOT_DIR")
+
 
 def open_private_tsv(private_link_token):
     private_tsv = pd.read_csv(
@@ -12,37 +24,187 @@ def open_private_tsv(private_link_token):
     return private_tsv
 
 
-def open_google_spreadsheet(acronym, file_link, header_index):
-    encodings = ['utf-8', 'ISO-8859-1', 'latin1']  # List of encodings to try
-    project_table = None
-    
-    for encoding in encodings:
-        try:
-            project_table = pd.read_csv(
-                file_link,
-                delimiter="\t",
-                header=header_index,
-                dtype=object,
-                quoting=3,
-                encoding=encoding
-            )
-            print(f"File opened successfully with {encoding} encoding.")
-            break  # Exit the loop if reading is successful
-        except UnicodeDecodeError:
-            print(f"Failed to open file with {encoding} encoding. Trying next...")
+def fetch_spreadsheet(file_link):
+    # download the sheet once, the raw bytes can be reused for caching and diffing
+    if os.path.exists(file_link):
+        with open(file_link, "rb") as file:
+            return file.read()
+    with urllib.request.urlopen(file_link) as response:
+        return response.read()
+
 
-    if project_table is None:
-        raise ValueError("Failed to open the file with the provided encodings.")
+def decode_spreadsheet(raw):
+    # ISO-8859-1 (latin1) can decode any bytes, so is the fallback for non UTF-8
+    try:
+        return raw.decode("utf-8-sig"), "utf-8"
+    except UnicodeDecodeError:
+        print("Failed to open file with utf-8 encoding. Trying ISO-8859-1...")
+        return raw.decode("ISO-8859-1"), "ISO-8859-1"
+
+
+def open_google_spreadsheet(acronym, file_link, header_index, raw=None):
+    if raw is None:
+        raw = fetch_spreadsheet(file_link)
+    text, encoding = decode_spreadsheet(raw)
+    project_table = pd.read_csv(
+        io.StringIO(text),
+        delimiter="\t",
+        header=header_index,
+        dtype=object,
+        quoting=3,
+    )
+    print(f"File opened successfully with {encoding} encoding.")
 
     project_table.rename(columns={"#NCBI_taxon_id": "NCBI_taxon_id"}, inplace=True)
     project_table["project"] = acronym.upper()
     return project_table
 
 
+# Snapshot cache for published sheets
+# each sheet keeps its raw bytes, validators, content hash and the expanded tsv
+# made from it, so a sheet that has not changed can skip all processing
+
+
+def source_hash(*paths):
+    # hash the processing code too, so changes to it invalidate the snapshots
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def load_snapshot(snapshot_dir, name):
+    try:
+        with open(f"{snapshot_dir}/{name}.json") as file:
+            snapshot = json.load(file)
+        with open(f"{snapshot_dir}/{name}.raw", "rb") as file:
+            snapshot["raw"] = file.read()
+    except (OSError, ValueError):
+        return None
+    if not os.path.exists(f"{snapshot_dir}/{name}.tsv"):
+        return None
+    return snapshot
+
+
+def fetch_snapshot(file_link, snapshot=None):
+    # conditional GET, a 304 response reuses the raw bytes from the snapshot
+    if os.path.exists(file_link):
+        return fetch_spreadsheet(file_link), {}
+    validators = snapshot["validators"] if snapshot else {}
+    request = urllib.request.Request(file_link)
+    if "etag" in validators:
+        request.add_header("If-None-Match", validators["etag"])
+    if "last_modified" in validators:
+        request.add_header("If-Modified-Since", validators["last_modified"])
+    try:
+        with urllib.request.urlopen(request) as response:
+            raw = response.read()
+            headers = response.headers
+    except urllib.error.HTTPError as err:
+        if err.code == 304 and snapshot:
+            return snapshot["raw"], validators
+        raise
+    return raw, {
+        key: headers[header]
+        for key, header in (("etag", "ETag"), ("last_modified", "Last-Modified"))
+        if header in headers
+    }
+
+
+def check_snapshot(snapshot_dir, name, file_link, options=""):
+    # returns the raw sheet, its new snapshot and whether the old one still holds
+    snapshot = load_snapshot(snapshot_dir, name) if snapshot_dir else None
+    raw, validators = fetch_snapshot(file_link, snapshot)
+    updated = {
+        "validators": validators,
+        "sha256": hashlib.sha256(raw).hexdigest(),
+        "options": options,
+        "raw": raw,
+    }
+    unchanged = snapshot is not None and all(
+        snapshot.get(key) == updated[key] for key in ("sha256", "options")
+    )
+    return raw, updated, unchanged
+
+
+def save_snapshot(snapshot_dir, name, snapshot, file_name):
+    # the json is written last, so an interrupted save leaves no valid snapshot
+    os.makedirs(snapshot_dir, exist_ok=True)
+    path = f"{snapshot_dir}/{name}"
+    if os.path.exists(f"{path}.json"):
+        os.remove(f"{path}.json")
+    shutil.copyfile(file_name, f"{path}.tsv.tmp")
+    os.replace(f"{path}.tsv.tmp", f"{path}.tsv")
+    with open(f"{path}.raw.tmp", "wb") as file:
+        file.write(snapshot["raw"])
+    os.replace(f"{path}.raw.tmp", f"{path}.raw")
+    meta = {key: value for key, value in snapshot.items() if key != "raw"}
+    with open(f"{path}.json.tmp", "w") as file:
+        json.dump(meta, file)
+    os.replace(f"{path}.json.tmp", f"{path}.json")
+
+
+def restore_snapshot(snapshot_dir, name, file_name):
+    shutil.copyfile(f"{snapshot_dir}/{name}.tsv", file_name)
+
+
+SURROUNDING_SPACES = re.compile(r"^ +| +$")
+
+
+def cleanup_values(
+    project_table, null=np.nan, null_blanks=True, strip_spaces=False, replacements=None
+):
+    """
+    Nulls blank cells, optionally strips leading and trailing spaces and swaps
+    exact values, in that order, in a single pass over the text columns.
+
+    Gives the same table as successive whole-table regex `replace` calls for
+    blank cells and surrounding spaces followed by each exact replacement, but
+    other columns are left alone and each distinct value in a column is only
+    cleaned once. Set null_blanks to False to only strip and replace.
+    """
+    replacements = list((replacements or {}).items())
+
+    def clean(value):
+        if not isinstance(value, str):
+            return value
+        if null_blanks and (not value or value.isspace()):
+            return null
+        if strip_spaces:
+            value = SURROUNDING_SPACES.sub("", value)
+        for old, new in replacements:
+            if value == old:
+                value = new
+        return value
+
+    def clean_column(values):
+        if pd.api.types.infer_dtype(values, skipna=True) != "string":
+            # empty or mixed columns are cleaned cell by cell
+            return np.array([clean(value) for value in values], dtype=object)
+        codes, uniques = pd.factorize(values)
+        cleaned = np.array([clean(value) for value in uniques] + [None], dtype=object)
+        column = cleaned[codes]
+        missing = codes < 0
+        column[missing] = values[missing]
+        return column
+
+    columns = {}
+    for position in range(project_table.shape[1]):
+        column = project_table.iloc[:, position]
+        if column.dtype == object or isinstance(column.dtype, pd.StringDtype):
+            column = pd.Series(
+                clean_column(column.to_numpy()), index=column.index, dtype=column.dtype
+            )
+        columns[position] = column
+    cleaned_table = pd.DataFrame(columns)
+    cleaned_table.columns = project_table.columns
+    return cleaned_table
+
+
 def general_cleanup_for_table(project_table):
-    project_table = project_table.replace(r"^\s*$", np.nan, regex=True)
-    project_table = project_table.replace(
-        "publication_available", "published", regex=False
+    project_table = cleanup_values(
+        project_table, replacements={"publication_available": "published"}
     )
     project_table.dropna(how="all", axis=1, inplace=True)
     project_table.dropna(how="all", axis=0, inplace=True)
@@ -128,44 +290,159 @@ def remove_acronym_prefix(project_table):
 
 # Expand sequencing status into columns:
 
+SEQUENCING_STATUSES = [
+    "sample_collected",
+    "sample_acquired",
+    "in_progress",
+    "data_generation",
+    "in_assembly",
+    "insdc_submitted",
+    "open",
+    "insdc_open",
+    "published",
+]
+
+# Each step marks the second status wherever the first one is marked, in order.
+# Statuses further down the list are implied by those above them.
+SEQUENCING_STATUS_HIERARCHY = [
+    ("published", "insdc_open"),
+    ("insdc_open", "open"),
+    ("open", "in_progress"),
+    ("data_generation", "in_progress"),
+    ("in_assembly", "in_progress"),
+    ("in_progress", "sample_acquired"),
+    ("sample_acquired", "sample_collected"),
+]
+
+
+def status_values(value):
+    # value can be one acronym for the whole table or a column of per-row values
+    if np.ndim(value) == 0:
+        return value
+    return np.asarray(value, dtype=object)
+
+
+def status_implications(statuses, hierarchy):
+    # run the hierarchy steps on each status alone to find every status it implies
+    index = {status: i for i, status in enumerate(statuses)}
+    implied = np.eye(len(statuses), dtype=bool)
+    for status, implies in hierarchy:
+        implied[:, index[implies]] |= implied[:, index[status]]
+    return implied
+
+
+def fill_status_columns(
+    project_table, value, hierarchy=SEQUENCING_STATUS_HIERARCHY, statuses=None
+):
+    # Same result as setting each of statuses to value where the sequencing_status
+    # names it, then applying each hierarchy step in turn as a .loc assignment.
+    # The sequencing_status is mapped to a rank in statuses, every implied status
+    # is found in one matrix product and each column is written at most once.
+    statuses = statuses or []
+    columns = list(
+        dict.fromkeys(statuses + [status for step in hierarchy for status in step])
+    )
+    values = status_values(value)
+    current = np.column_stack(
+        [(project_table[column] == values).to_numpy() for column in columns]
+    )
+    marked = current.copy()
+    if statuses:
+        ranks = pd.Categorical(project_table["sequencing_status"], categories=statuses)
+        marked[:, : len(statuses)] |= ranks.codes[:, None] == np.arange(len(statuses))
+    implied = status_implications(columns, hierarchy).astype(np.int32)
+    mask = (marked.astype(np.int32) @ implied > 0) & ~current
+    for column, column_mask in zip(columns, mask.T):
+        if column_mask.any():
+            filled = project_table[column].to_numpy(dtype=object, copy=True)
+            filled[column_mask] = (
+                values if np.ndim(values) == 0 else values[column_mask]
+            )
+            if isinstance(project_table[column].dtype, pd.CategoricalDtype):
+                filled = pd.Categorical(filled)
+            project_table[column] = filled
+    return project_table
+
 
 def create_status_column(project_table, acronym):
-    possible_seq_status = [
-        "sample_collected",
-        "sample_acquired",
-        "in_progress",
-        "data_generation",
-        "in_assembly",
-        "insdc_submitted",
-        "open",
-        "insdc_open",
-        "published",
-    ]
-    for item in possible_seq_status:
+    for item in SEQUENCING_STATUSES:
         if item not in project_table:
             project_table[item] = np.nan
-    # return project_table
-    for item in possible_seq_status:
-        project_table.loc[project_table["sequencing_status"] == item, item] = acronym
-    return project_table
+    return fill_status_columns(project_table, acronym, [], SEQUENCING_STATUSES)
 
 
 def expand_sequencing_status(project_table, acronym):
-    project_table.loc[project_table["published"] == acronym, "insdc_open"] = acronym
-    project_table.loc[project_table["insdc_open"] == acronym, "open"] = acronym
-    project_table.loc[project_table["open"] == acronym, "in_progress"] = acronym
-    project_table.loc[
-        project_table["data_generation"] == acronym, "in_progress"
-    ] = acronym
-    project_table.loc[project_table["in_assembly"] == acronym, "in_progress"] = acronym
-    project_table.loc[
-        project_table["in_progress"] == acronym, "sample_acquired"
-    ] = acronym
-    project_table.loc[
-        project_table["sample_acquired"] == acronym, "sample_collected"
-    ] = acronym
+    return fill_status_columns(project_table, acronym)
+
+
+def fill_sequencing_status(project_table, acronym):
+    # create_status_column and expand_sequencing_status in a single pass
+    for item in SEQUENCING_STATUSES:
+        if item not in project_table:
+            project_table[item] = np.nan
+    return fill_status_columns(
+        project_table, acronym, SEQUENCING_STATUS_HIERARCHY, SEQUENCING_STATUSES
+    )
+
+
+# Store low-cardinality columns as categoricals:
+
+# columns that each hold one of a few acronyms or statuses, or are empty
+STATUS_COLUMNS = [
+    "project",
+    "target_list_status",
+    "sequencing_status",
+    "long_list",
+    "family_representative",
+    "other_priority",
+] + SEQUENCING_STATUSES
+
+
+def categorize_status_columns(project_table, columns=STATUS_COLUMNS):
+    # each distinct value is stored once and rows only hold a small integer code,
+    # which makes comparisons cheap and writes the same TSV as object columns
+    for column in columns:
+        if column in project_table and not isinstance(
+            project_table[column].dtype, pd.CategoricalDtype
+        ):
+            # go through object so empty columns get object, not float, categories
+            project_table[column] = (
+                project_table[column].astype(object).astype("category")
+            )
     return project_table
 
+
+def concat_status_tables(tables):
+    # pd.concat turns categorical columns back into object columns unless every
+    # table has them with the same categories, so give them the union first
+    tables = [table.copy(deep=False) for table in tables]
+    columns = list(
+        dict.fromkeys(
+            column
+            for table in tables
+            for column, dtype in table.dtypes.items()
+            if isinstance(dtype, pd.CategoricalDtype)
+        )
+    )
+    for column in columns:
+        categories = set()
+        for table in tables:
+            if column in table:
+                categories.update(table[column].dropna().unique())
+        dtype = pd.CategoricalDtype(sorted(categories, key=str))
+        for table in tables:
+            if column in table:
+                table[column] = table[column].astype(dtype)
+            else:
+                table[column] = pd.Categorical([np.nan] * len(table), dtype=dtype)
+    return pd.concat(tables, ignore_index=True)
+
+
+def read_expanded_tsv(file_name, columns=STATUS_COLUMNS):
+    project_table = pd.read_csv(file_name, sep="\t", dtype=object)
+    return categorize_status_columns(project_table, columns)
+
+
 # create mandatory columns
 
 def create_mandatory_columns(project_table):
@@ -195,9 +472,19 @@ def export_expanded_tsv(project_table, acronym, dir):
 # Putting all together for standard GoaT spreadsheets, schema 2.5
 
 
-def processing_schema_2_5_lists(acronym, url, start_row, dir):
+def processing_schema_2_5_lists(
+    acronym, url, start_row, dir, snapshot_dir=SNAPSHOT_DIR
+):
     print(f"opening {acronym} url ...")
-    project_table = open_google_spreadsheet(acronym, url, start_row)
+    file_name = f"{dir}/{acronym}_expanded.tsv"
+    raw, snapshot, unchanged = check_snapshot(
+        snapshot_dir, acronym, url, options=f"{start_row} {source_hash(__file__)}"
+    )
+    if unchanged:
+        print(f"{acronym} is unchanged, reusing the snapshot")
+        restore_snapshot(snapshot_dir, acronym, file_name)
+        return
+    project_table = open_google_spreadsheet(acronym, url, start_row, raw=raw)
     print(f"cleaning up {acronym} table ...")
     project_table = general_cleanup_for_table(project_table)
     project_table = cleanup_headers_specific_units(project_table)
@@ -205,8 +492,143 @@ def processing_schema_2_5_lists(acronym, url, start_row, dir):
     project_table = create_mandatory_columns(project_table)
     print(f"expanding {acronym} target status ...")
     project_table = expand_target_status(project_table, acronym)
-    project_table = create_status_column(project_table, acronym)
     print(f"expanding {acronym} sequencing status ...")
-    project_table = expand_sequencing_status(project_table, acronym)
+    project_table = fill_sequencing_status(project_table, acronym)
+    project_table = categorize_status_columns(project_table)
     print(f"saving {acronym} to file")
     export_expanded_tsv(project_table, acronym, dir)
+    if snapshot_dir:
+        save_snapshot(snapshot_dir, acronym, snapshot, file_name)
+
+
+# Merge the expanded status lists of all projects into one table:
+
+# kept from the first project that names the taxon
+MERGED_NAME_COLUMNS = ["species", "family"]
+
+# comma-joined acronyms of every project that sets them for the taxon
+MERGED_STATUS_COLUMNS = [
+    "project",
+    "long_list",
+    "family_representative",
+    "other_priority",
+] + SEQUENCING_STATUSES
+
+
+def join_status_acronyms(taxa, column, taxon_count):
+    # Each category is mapped to the acronyms it lists (cells can already hold
+    # comma-separated acronyms), the categories present for each taxon are marked
+    # and one matrix product finds every acronym set for it. Each distinct set of
+    # acronyms is then joined only once.
+    column = pd.Categorical(column)
+    listed = [
+        {acronym.strip() for acronym in str(category).split(",")} - {""}
+        for category in column.categories
+    ]
+    acronyms = np.array(sorted(set().union(*listed)), dtype=object)
+    if not len(acronyms):
+        return np.full(taxon_count, np.nan, dtype=object)
+    member = np.array(
+        [[acronym in names for acronym in acronyms] for names in listed],
+        dtype=np.int32,
+    ).reshape(len(listed), len(acronyms))
+    codes = column.codes
+    known = codes >= 0
+    categories = np.zeros((taxon_count, len(listed)), dtype=np.int32)
+    categories[taxa[known], codes[known]] = 1
+    present = categories @ member > 0
+    if len(acronyms) <= 64:
+        # pack each taxon's acronyms into one integer key to hash them quickly
+        keys = np.zeros((taxon_count, 8), dtype=np.uint8)
+        packed = np.packbits(present, axis=1)
+        keys[:, : packed.shape[1]] = packed
+        inverse, _ = pd.factorize(keys.view(np.uint64).reshape(-1))
+        first = np.zeros(inverse.max(initial=-1) + 1, dtype=np.intp)
+        first[inverse[::-1]] = np.arange(taxon_count)[::-1]
+        combinations = present[first]
+    else:
+        combinations, inverse = np.unique(present, axis=0, return_inverse=True)
+    joined = np.array(
+        [",".join(acronyms[combination]) or np.nan for combination in combinations],
+        dtype=object,
+    )
+    return joined[inverse.reshape(-1)]
+
+
+def merge_status_tables(tables):
+    """
+    Merges expanded status lists into one table indexed by ncbi_taxon_id, sorted
+    by taxon ID. Rows without a taxon ID are dropped.
+    """
+    merged = concat_status_tables(
+        [categorize_status_columns(table.copy(deep=False)) for table in tables]
+    )
+    merged = merged[merged["ncbi_taxon_id"].notna()]
+    taxa, taxon_ids = pd.factorize(merged["ncbi_taxon_id"])
+    columns = {"ncbi_taxon_id": np.asarray(taxon_ids, dtype=object)}
+    names = [column for column in MERGED_NAME_COLUMNS if column in merged]
+    if names:
+        first = merged[names].astype(object).groupby(taxa).first()
+        for column in names:
+            columns[column] = first[column].to_numpy()
+    for column in MERGED_STATUS_COLUMNS:
+        if column in merged:
+            columns[column] = join_status_acronyms(taxa, merged[column], len(taxon_ids))
+    merged_table = pd.DataFrame(columns)
+    order = merged_table.assign(
+        taxon_number=pd.to_numeric(merged_table["ncbi_taxon_id"], errors="coerce")
+    ).sort_values(["taxon_number", "ncbi_taxon_id"], kind="stable")
+    return merged_table.loc[order.index].set_index("ncbi_taxon_id")
+
+
+def read_merged_status_table(file_name):
+    # set the index after reading, index_col would parse the taxon IDs as numbers
+    merged_table = pd.read_csv(file_name, sep="\t", dtype=object)
+    return merged_table.set_index("ncbi_taxon_id")
+
+
+def write_merged_status_table(merged_table, file_name):
+    merged_table.to_csv(f"{file_name}.tmp", sep="\t")
+    os.replace(f"{file_name}.tmp", file_name)
+
+
+def diff_status_tables(previous, merged):
+    """
+    Compares two merged status tables row by row.
+
+    Returns a table with a row for each taxon that was added, removed or changed,
+    with the change and the columns that differ.
+    """
+    columns = list(dict.fromkeys(list(previous.columns) + list(merged.columns)))
+    previous = previous.reindex(columns=columns).astype(object).fillna("")
+    merged = merged.reindex(columns=columns).astype(object).fillna("")
+    common = merged.index.intersection(previous.index)
+    differs = (
+        previous.loc[common].to_numpy() != merged.loc[common].to_numpy()
+    ).reshape(len(common), len(columns))
+    changed = differs.any(axis=1)
+    names = np.array(columns, dtype=object)
+    diffs = [
+        pd.DataFrame(
+            {
+                "ncbi_taxon_id": merged.index.difference(previous.index),
+                "change": "added",
+                "columns": "",
+            }
+        ),
+        pd.DataFrame(
+            {
+                "ncbi_taxon_id": previous.index.difference(merged.index),
+                "change": "removed",
+                "columns": "",
+            }
+        ),
+        pd.DataFrame(
+            {
+                "ncbi_taxon_id": common[changed],
+                "change": "changed",
+                "columns": [",".join(names[row]) for row in differs[changed]],
+            }
+        ),
+    ]
+    return pd.concat(diffs, ignore_index=True)
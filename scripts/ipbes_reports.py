@@ -6,14 +6,125 @@ This script fetches and combines GoaT reports to summarise available data
 per country by taxon.
 """
 import argparse
+import hashlib
+import json
 import os
 import sys
+import tempfile
+import threading
+import time
 from collections import defaultdict
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional, Tuple
 from urllib.parse import quote
 
+import numpy as np
 import requests
 import yaml
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_WORKERS = 8
+DEFAULT_RETRIES = 3
+DEFAULT_CACHE_TTL = 24
+
+
+class ResponseCache:
+    """
+    URL-keyed on-disk cache of GoaT API JSON responses.
+
+    Entries expire after `ttl` hours. If a release is given it is included in
+    the key, so responses cached for one GoaT release are not used for another.
+    """
+
+    def __init__(
+        self, cache_dir: str, ttl: float = DEFAULT_CACHE_TTL, release: str = ""
+    ):
+        self.cache_dir = cache_dir
+        self.ttl = ttl * 3600
+        self.release = release
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path(self, url: str) -> str:
+        key = hashlib.sha256(f"{self.release}\n{url}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, url: str) -> Any:
+        path = self.path(url)
+        data = None
+        try:
+            if time.time() - os.path.getmtime(path) < self.ttl:
+                with open(path, "r") as file:
+                    data = json.load(file)
+        except (OSError, ValueError):
+            data = None
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def set(self, url: str, data: Any) -> None:
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.cache_dir, suffix=".tmp", delete=False
+        ) as file:
+            json.dump(data, file)
+        os.replace(file.name, self.path(url))
+
+    def summary(self) -> str:
+        return f"Response cache: {self.hits} hits, {self.misses} misses"
+
+
+def create_session(
+    workers: int = DEFAULT_WORKERS, retries: int = DEFAULT_RETRIES
+) -> requests.Session:
+    """
+    Create a pooled session that retries failed GoaT API requests.
+
+    Once the retries run out the last response is returned rather than raised,
+    so callers can log and skip a failing request as before.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=workers, pool_maxsize=workers, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_json(
+    url: str,
+    session: Optional[requests.Session] = None,
+    cache: Optional[ResponseCache] = None,
+) -> Tuple[int, Any]:
+    """
+    Get a JSON response from the GoaT API, using the response cache if given.
+
+    Only successful responses are added to the cache.
+    """
+    if cache is not None:
+        data = cache.get(url)
+        if data is not None:
+            return 200, data
+    response = (session or requests).get(url)
+    if response.status_code != 200:
+        return response.status_code, None
+    data = response.json()
+    if cache is not None and data and data.get("status", {}).get("success", True):
+        cache.set(url, data)
+    return 200, data
 
 
 def load_country_codes(
@@ -94,24 +205,58 @@ def count_groups(
     modifier: str,
     group_rank: str,
     country_field: str,
+    session: Optional[requests.Session] = None,
+    cache: Optional[ResponseCache] = None,
+    country_codes: str = "",
 ) -> int:
     """
     Count the number of using GoaT API /count endpoint.
     """
     query_string = build_query_string(
-        root_taxon, modifier, group_rank, group_rank, country_field
+        root_taxon, modifier, group_rank, group_rank, country_field, country_codes
     )
     url = f"{base_url}/count?{query_string}"
-    response = requests.get(url)
+    status_code, data = get_json(url, session, cache)
 
-    if response.status_code != 200:
-        print(f"Error fetching data from {url}: {response.status_code}")
+    if status_code != 200:
+        print(f"Error fetching data from {url}: {status_code}")
         sys.exit(1)
 
-    data = response.json()
     return data.get("count", 0)
 
 
+def chunk_bins(size: int, group_total: int, group_count: int) -> int:
+    """
+    Upper bound on the bins in a report for a chunk of countries.
+
+    The groups in a chunk can be no more than the sum of the per-country group
+    counts, nor more than the number of groups overall.
+    """
+    return size * min(group_count, group_total)
+
+
+def pack_country_codes(
+    country_counts: dict, group_count: int, max_bins: int = 2500
+) -> List[List[str]]:
+    """
+    Pack countries into as few chunks as possible without exceeding max_bins.
+
+    Countries are placed first-fit in order of decreasing group count, so each
+    chunk stays within max_bins however the groups in it overlap.
+    """
+    chunks = []
+    for country_code in sorted(country_counts, key=lambda c: (-country_counts[c], c)):
+        count = country_counts[country_code]
+        for chunk in chunks:
+            if chunk_bins(len(chunk[1]) + 1, chunk[0] + count, group_count) <= max_bins:
+                chunk[0] += count
+                chunk[1].append(country_code)
+                break
+        else:
+            chunks.append([count, [country_code]])
+    return sorted(sorted(codes) for _, codes in chunks)
+
+
 def build_report_urls(
     country_codes: List[str],
     base_url: str,
@@ -120,21 +265,30 @@ def build_report_urls(
     count_rank: str,
     group_rank: str,
     country_field: str,
+    country_counts: dict,
     max_bins: int = 2500,
+    session: Optional[requests.Session] = None,
+    cache: Optional[ResponseCache] = None,
 ) -> List[str]:
     """
     Build URLs for the GoaT API to fetch reports.
+
+    Countries are packed into per-country report URLs using their group counts.
+    The `country_counts` may be fetched without the modifier, as they are an
+    upper bound on the counts with any modifier.
     """
     group_count = count_groups(
-        base_url, root_taxon, modifier, group_rank, country_field
+        base_url, root_taxon, modifier, group_rank, country_field, session, cache
     )
     if group_count > max_bins:
         print(
             f"Warning: The number of groups ({group_count}) exceeds the maximum "
             f"allowed ({max_bins}). Some groups may not be included in the report."
         )
-    grouped_country_codes = group_country_codes(
-        country_codes, int(max_bins // group_count)
+    grouped_country_codes = pack_country_codes(
+        {code: country_counts.get(code, group_count) for code in country_codes},
+        group_count,
+        max_bins,
     )
     # Build a URL for all countries combined
     xOpts = quote("1;1000000000000;2")
@@ -151,6 +305,8 @@ def build_report_urls(
     urls = [url]
     # Build per country URLs
     for group in grouped_country_codes:
+        group_total = sum(country_counts.get(code, group_count) for code in group)
+        cat_count = max(1, min(group_count, group_total))
         group_str = ",".join(group)
         xOpts = quote(f"{group_str};;{len(group)}")
         query_string = build_query_string(
@@ -162,7 +318,7 @@ def build_report_urls(
         url = (
             f"{base_url}/report?{query_string}&"
             f"report=table&rank={count_rank}&"
-            f"cat={group_rank}[{group_count}]&"
+            f"cat={group_rank}[{cat_count}]&"
             f"xOpts={xOpts}&compactLegend=true"
         )
         urls.append(url)
@@ -185,34 +341,60 @@ def update_translate_keys(translate_keys: dict, new_keys: list) -> None:
             translate_keys[key] = label
 
 
-def parse_reports(urls: List[str]) -> dict:
+def fetch_report(
+    url: str,
+    session: Optional[requests.Session] = None,
+    cache: Optional[ResponseCache] = None,
+) -> Optional[dict]:
     """
-    Parse the reports from the provided URLs.
+    Fetch a single report from the GoaT API.
 
-    This function creates a single dictionary summarizing all reports
+    Returns None if the request fails or the report is empty or unsuccessful.
     """
-    translate_keys = {}
-    all_buckets = []
-    results = defaultdict(lambda: defaultdict(int))
-    for url in urls:
-        print(f"Fetching data from: {url}")
-        response = requests.get(url)
-        if response.status_code != 200:
-            print(f"Error fetching data from {url}: {response.status_code}")
-            continue
+    print(f"Fetching data from: {url}")
+    status_code, data = get_json(url, session, cache)
+    if status_code != 200:
+        print(f"Error fetching data from {url}: {status_code}")
+        return None
 
-        data = response.json()
-        if not data:
-            print(f"No data found for URL: {url}")
-            continue
+    if not data:
+        print(f"No data found for URL: {url}")
+        return None
 
-        if not data.get("status", {}).get("success", False):
-            print(
-                (
-                    f"Error in response for URL {url}: "
-                    f"{data.get('status', {}).get('error', 'Unknown error')}"
-                )
+    if not data.get("status", {}).get("success", False):
+        print(
+            (
+                f"Error in response for URL {url}: "
+                f"{data.get('status', {}).get('error', 'Unknown error')}"
             )
+        )
+        return None
+    return data
+
+
+def fetch_reports(
+    urls: List[str],
+    session: Optional[requests.Session] = None,
+    workers: int = DEFAULT_WORKERS,
+    cache: Optional[ResponseCache] = None,
+) -> List[dict]:
+    """
+    Fetch reports concurrently, returning them in the same order as the URLs.
+    """
+    session = session or create_session(workers)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda url: fetch_report(url, session, cache), urls))
+
+
+def merge_reports(reports: List[dict]) -> dict:
+    """
+    Merge fetched reports into a single dictionary summarizing all reports.
+    """
+    translate_keys = {}
+    all_buckets = []
+    results = defaultdict(lambda: defaultdict(int))
+    for data in reports:
+        if data is None:
             continue
 
         table = data.get("report", {}).get("report", {}).get("table", {})
@@ -237,34 +419,234 @@ def parse_reports(urls: List[str]) -> dict:
     }
 
 
-def write_results_to_csv(
-    results: list, group_rank: str, modifiers: list, translate_keys: dict, outfile: str
-) -> None:
+def parse_reports(
+    urls: List[str],
+    session: Optional[requests.Session] = None,
+    workers: int = DEFAULT_WORKERS,
+    cache: Optional[ResponseCache] = None,
+) -> dict:
+    """
+    Parse the reports from the provided URLs.
+
+    This function creates a single dictionary summarizing all reports
     """
-    Write the results to a CSV file.
+    return merge_reports(fetch_reports(urls, session, workers, cache))
+
+
+def results_to_matrix(
+    result_sets: List[dict],
+) -> Tuple[list, list, np.ndarray, np.ndarray]:
     """
+    Convert per-modifier results into an array indexed by country, taxon and
+    modifier.
 
+    Countries and taxa are those present in the first (unmodified) result set.
+    For each country, the indices of its taxa are returned in the order the first
+    result set lists them.
+    """
+    countries = [
+        country
+        for country in result_sets[0]
+        if isinstance(country, str) or str(country) == "1"
+    ]
+    keys = list(
+        dict.fromkeys(key for country in countries for key in result_sets[0][country])
+    )
+    country_index = {country: idx for idx, country in enumerate(countries)}
+    key_index = {key: idx for idx, key in enumerate(keys)}
+    values = np.zeros((len(countries), len(keys), len(result_sets)), dtype=np.int64)
+    key_indices = [
+        [key_index[key] for key in result_sets[0][country]] for country in countries
+    ]
+    for modifier_idx, results in enumerate(result_sets):
+        for country, counts in results.items():
+            if (country_idx := country_index.get(country)) is None:
+                continue
+            for key, value in counts.items():
+                if (key_idx := key_index.get(key)) is None:
+                    continue
+                values[country_idx, key_idx, modifier_idx] = value
+    return countries, keys, values, key_indices
+
+
+def write_matrix_to_csv(
+    countries: list,
+    keys: list,
+    values: np.ndarray,
+    key_indices: List[List[int]],
+    group_rank: str,
+    modifiers: list,
+    translate_keys: dict,
+    outfile: str,
+) -> None:
+    """
+    Write a country by taxon by modifier results array to a CSV file.
+    """
+    fieldnames = ["country_code", group_rank] + [
+        modifier or "all" for modifier in modifiers
+    ]
+    country_names = [
+        country.upper() if isinstance(country, str) else "TOTAL"
+        for country in countries
+    ]
+    labels = [translate_keys.get(key, key) for key in keys]
+    rows = [
+        ",".join([country_names[i], labels[j], *map(str, values[i, j])])
+        for i, country_key_indices in enumerate(key_indices)
+        for j in country_key_indices
+    ]
     with open(outfile, "w", newline="") as csvfile:
-        fieldnames = ["country_code", group_rank] + [
-            modifier or "all" for modifier in modifiers
+        csvfile.write("\n".join([",".join(fieldnames)] + rows) + "\n")
+
+
+def load_batch(file_path: str, args: argparse.Namespace) -> List[dict]:
+    """
+    Load a matrix of reports to generate in a single batch.
+
+    The YAML file has a list of reports, each of which must set a unique outfile
+    and may set root_taxon, group_rank, count_rank and modifiers. Unset values
+    are taken from the command line arguments:
+    # reports:
+    #   - root_taxon: 32523[Tetrapoda]
+    #     group_rank: order
+    #     modifiers: [assembly_level, ebp_standard_criteria]
+    #     outfile: goat_ipbes_report_order.csv
+    """
+    if not os.path.exists(file_path):
+        print(f"File {file_path} does not exist.")
+        sys.exit(1)
+    with open(file_path, "r") as file:
+        data = yaml.safe_load(file)
+    entries = []
+    outfiles = set()
+    for index, entry in enumerate(data.get("reports", []), 1):
+        outfile = entry.get("outfile")
+        if not outfile:
+            print(f"Report {index} in {file_path} does not set an outfile.")
+            sys.exit(1)
+        if outfile in outfiles:
+            print(f"Report {index} in {file_path} repeats the outfile {outfile}.")
+            sys.exit(1)
+        outfiles.add(outfile)
+        entries.append(report_entry(args, **entry))
+    return entries
+
+
+def report_entry(args: argparse.Namespace, **kwargs) -> dict:
+    """
+    Build a report entry, taking unset values from the command line arguments.
+    """
+    entry = {
+        key: kwargs.get(key, getattr(args, key))
+        for key in ("root_taxon", "group_rank", "count_rank", "outfile")
+    }
+    modifiers = [
+        modifier.strip() for modifier in kwargs.get("modifiers", args.modifiers)
+    ]
+    if "" not in modifiers:
+        modifiers.insert(0, "")
+    entry["modifiers"] = modifiers
+    return entry
+
+
+def plan_key(entry: dict, modifier: str) -> Tuple[str, str, str, str]:
+    """
+    Key identifying the set of report URLs needed for an entry and modifier.
+    """
+    return (entry["root_taxon"], entry["group_rank"], entry["count_rank"], modifier)
+
+
+def run_report_matrix(
+    entries: List[dict],
+    country_codes: List[str],
+    args: argparse.Namespace,
+    session: Optional[requests.Session] = None,
+    cache: Optional[ResponseCache] = None,
+) -> None:
+    """
+    Fetch and write a matrix of reports with a deduplicated set of requests.
+
+    Group counts, URL sets and reports are fetched once for each distinct
+    root taxon, rank and modifier, however many entries share them.
+    """
+    pairs = list(
+        dict.fromkeys((entry["root_taxon"], entry["group_rank"]) for entry in entries)
+    )
+
+    # Per-country counts without a modifier bound the counts for every modifier,
+    # fetched for every root taxon, rank and country in a single pool
+    jobs = [(pair, country_code) for pair in pairs for country_code in country_codes]
+
+    def job_count(job: Tuple[Tuple[str, str], str]) -> int:
+        (root_taxon, group_rank), country_code = job
+        return count_groups(
+            args.base_url,
+            root_taxon,
+            "",
+            group_rank,
+            args.country_field,
+            session,
+            cache,
+            country_code,
+        )
+
+    country_counts = {pair: {} for pair in pairs}
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        for (pair, country_code), count in zip(jobs, executor.map(job_count, jobs)):
+            country_counts[pair][country_code] = count
+
+    plans = list(
+        dict.fromkeys(
+            plan_key(entry, modifier)
+            for entry in entries
+            for modifier in entry["modifiers"]
+        )
+    )
+
+    def plan_urls(plan: Tuple[str, str, str, str]) -> List[str]:
+        root_taxon, group_rank, count_rank, modifier = plan
+        return build_report_urls(
+            country_codes,
+            args.base_url,
+            root_taxon,
+            modifier,
+            count_rank,
+            group_rank,
+            args.country_field,
+            country_counts[(root_taxon, group_rank)],
+            args.max_bins,
+            session,
+            cache,
+        )
+
+    # Fetch the group counts and then every distinct report in one pool
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        url_sets = dict(zip(plans, executor.map(plan_urls, plans)))
+    urls = list(dict.fromkeys(url for plan in plans for url in url_sets[plan]))
+    reports = dict(zip(urls, fetch_reports(urls, session, args.workers, cache)))
+    if cache is not None:
+        print(cache.summary())
+
+    outputs = {
+        plan: merge_reports([reports[url] for url in url_sets[plan]]) for plan in plans
+    }
+    for entry in entries:
+        plan_outputs = [
+            outputs[plan_key(entry, modifier)] for modifier in entry["modifiers"]
         ]
-        csvfile.write(",".join(fieldnames) + "\n")
-        for country_code, values in results[0].items():
-            for key, value in values.items():
-                translated_key = translate_keys.get(key, key)
-                try:
-                    row = [country_code.upper(), translated_key]
-                except AttributeError:
-                    if str(country_code) == "1":
-                        row = ["TOTAL", translated_key]
-                    else:
-                        continue
-                for idx, _ in enumerate(modifiers):
-                    if idx == 0:
-                        row.append(str(value))
-                    else:
-                        row.append(str(results[idx].get(country_code, {}).get(key, 0)))
-                csvfile.write(",".join(row) + "\n")
+        countries, keys, values, key_indices = results_to_matrix(
+            [output.get("results", {}) for output in plan_outputs]
+        )
+        write_matrix_to_csv(
+            countries,
+            keys,
+            values,
+            key_indices,
+            entry["group_rank"],
+            entry["modifiers"],
+            plan_outputs[0].get("translate_keys", {}),
+            entry["outfile"],
+        )
 
 
 def parse_args() -> str:
@@ -339,6 +721,63 @@ def parse_args() -> str:
             "when generating URLs."
         ),
     )
+    parser.add_argument(
+        "--workers",
+        dest="workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=(
+            "Maximum number of concurrent requests to the GoaT API "
+            f"(default: {DEFAULT_WORKERS})."
+        ),
+    )
+    parser.add_argument(
+        "--retries",
+        dest="retries",
+        type=int,
+        default=DEFAULT_RETRIES,
+        help=(
+            "Number of times to retry a failed request to the GoaT API "
+            f"(default: {DEFAULT_RETRIES})."
+        ),
+    )
+    parser.add_argument(
+        "--cache-dir",
+        dest="cache_dir",
+        type=str,
+        default=None,
+        help="Directory in which to cache GoaT API responses (default: no cache).",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        dest="cache_ttl",
+        type=float,
+        default=DEFAULT_CACHE_TTL,
+        help=(
+            "Number of hours before a cached response expires "
+            f"(default: {DEFAULT_CACHE_TTL})."
+        ),
+    )
+    parser.add_argument(
+        "--cache-release",
+        dest="cache_release",
+        type=str,
+        default="",
+        help=(
+            "GoaT release or index version to include in the cache key, so a new "
+            "release does not reuse cached responses (default: none)."
+        ),
+    )
+    parser.add_argument(
+        "--batch",
+        dest="batch",
+        type=str,
+        default=None,
+        help=(
+            "Path to a YAML file listing reports to generate in one batch, each "
+            "with its own root_taxon, group_rank, modifiers and outfile."
+        ),
+    )
     parser.add_argument(
         "--outfile",
         dest="outfile",
@@ -358,44 +797,22 @@ def main():
     # Load country codes from the specified file
     country_codes = load_country_codes(args.country_codes_file, args.country_field)
 
-    # Build report URLs based on the provided parameters
-    modifiers = args.modifiers or [""]
-    if "" not in modifiers:
-        modifiers.insert(0, "")
-
-    result_sets = []
-    translate_keys = {}
+    # Build a single report from the arguments, or a matrix from a batch file
+    if args.batch:
+        entries = load_batch(args.batch, args)
+    else:
+        entries = [report_entry(args)]
 
-    for idx, modifier in enumerate(modifiers):
-        modifier = modifier.strip()
-        urls = build_report_urls(
-            country_codes,
-            args.base_url,
-            args.root_taxon,
-            modifier,
-            args.count_rank,
-            args.group_rank,
-            args.country_field,
-            args.max_bins,
-        )
+    session = create_session(args.workers, args.retries)
+    cache = None
+    if args.cache_dir:
+        cache = ResponseCache(args.cache_dir, args.cache_ttl, args.cache_release)
 
-        output = parse_reports(urls)
-        if idx == 0:
-            translate_keys = output.get("translate_keys", {})
-        result_sets.append(output.get("results", {}))
-
-    # Write the results to a CSV file
-    write_results_to_csv(
-        result_sets,
-        args.group_rank,
-        modifiers,
-        translate_keys,
-        args.outfile,
-    )
+    # Fetch the reports and write the results to CSV files
+    run_report_matrix(entries, country_codes, args, session, cache)
 
 
 if __name__ == "__main__":
-    main()
     sys.exit(main())
 
 
@@ -413,3 +830,8 @@ if __name__ == "__main__":
 #     --outfile goat_ipbes_report_class.csv \
 #     --group-rank class \
 #     --root-taxon '2759[Eukaryota]'
+
+# or both reports can be generated in one batch, sharing requests, with:
+# python scripts/ipbes_reports.py sources/regional-lists/ATTR_regional_list.types.yaml \
+#     --max-bins 2500 \
+#     --batch ipbes_reports.yaml
@@ -1,73 +1,174 @@
 #!/usr/bin/env python
 
+import codecs
+import contextlib
 import csv
+import json
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 
-output_filename = f"{sys.argv[1]}/jgi_1kfg.tsv"
-
-try:
-    url = "https://gold-ws.jgi.doe.gov"
-    OFFLINE_TOKEN = sys.argv[2]
-    ACCESS_TOKEN = requests.get(
-        url + "/exchange?offlineToken=" + OFFLINE_TOKEN
-    ).content.decode()
-
-    headers = {"Authorization": "Bearer " + ACCESS_TOKEN, "Accept": "application/json"}
-
-    r = requests.get(
-        url + "/api/v1/organisms?studyGoldId=Gs0000001", headers=headers
-    ).json()
-    org2taxid = {}
-
-    for organism in r:
-        org2taxid[organism["organismGoldId"]] = organism["ncbiTaxId"]
-
-    r = requests.get(
-        url + "/api/v1/projects?studyGoldId=Gs0000001", headers=headers
-    ).json()
-
-    fieldnames = [
-        "projectGoldId",
-        "projectName",
-        "legacyGoldId",
-        "studyGoldId",
-        "biosampleGoldId",
-        "organismGoldId",
-        "itsProposalId",
-        "itsSpid",
-        "itsSampleId",
-        "pmoProjectId",
-        "gptsProposalId",
-        "ncbiBioProjectAccession",
-        "ncbiBioSampleAccession",
-        "projectStatus",
-        "sequencingStatus",
-        "jgiFundingProgram",
-        "jgiFundingYear",
-        "hmpId",
-        "modDate",
-        "addDate",
-        "sequencingStrategy",
-        "sequencingCenters",
-        "seqMethod",
-        "genomePublications",
-        "otherPublications",
-        "sraExperimentIds",
-    ]
-
-    with open(output_filename, "w") as output_file:
-        writer = csv.writer(output_file, delimiter="\t", lineterminator="\n")
-        writer.writerow(fieldnames + ["ncbiTaxId"])
-
-        for project in r:
-            d = [project.get(f) for f in fieldnames]
-            if project["sequencingStrategy"] == "Whole Genome Sequencing":
-                writer.writerow(d + [org2taxid[project["organismGoldId"]]])
-
-except Exception:
-    print(f"something has gone wrong: {output_filename}")
+url = "https://gold-ws.jgi.doe.gov"
+study_gold_id = "Gs0000001"
+retries = 3
+
+fieldnames = [
+    "projectGoldId",
+    "projectName",
+    "legacyGoldId",
+    "studyGoldId",
+    "biosampleGoldId",
+    "organismGoldId",
+    "itsProposalId",
+    "itsSpid",
+    "itsSampleId",
+    "pmoProjectId",
+    "gptsProposalId",
+    "ncbiBioProjectAccession",
+    "ncbiBioSampleAccession",
+    "projectStatus",
+    "sequencingStatus",
+    "jgiFundingProgram",
+    "jgiFundingYear",
+    "hmpId",
+    "modDate",
+    "addDate",
+    "sequencingStrategy",
+    "sequencingCenters",
+    "seqMethod",
+    "genomePublications",
+    "otherPublications",
+    "sraExperimentIds",
+]
+
+
+class GoldSession(requests.Session):
+    """A session that exchanges the offline token once and reuses the access
+    token for every request, exchanging it again if it has expired."""
+
+    def __init__(self, offline_token):
+        super().__init__()
+        self.offline_token = offline_token
+        self.headers["Accept"] = "application/json"
+        self.exchange_token()
+
+    def exchange_token(self):
+        r = requests.get(url + "/exchange", params={"offlineToken": self.offline_token})
+        r.raise_for_status()
+        access_token = r.content.decode()
+        self.headers["Authorization"] = "Bearer " + access_token
+
+    def get_api(self, path, **kwargs):
+        r = self.get(url + path, **kwargs)
+        if r.status_code == 401:
+            self.exchange_token()
+            r = self.get(url + path, **kwargs)
+        r.raise_for_status()
+        return r
+
+
+def iter_json_array(r, chunk_size=65536):
+    """Yield the items of a JSON array response as its body arrives.
+
+    Decodes the same way as parse_blobtoolkit.iter_json_array, and raises
+    ValueError if the body is not a JSON array or ends before the array is closed.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    started = False
+    for chunk in r.iter_content(chunk_size):
+        buffer += text.decode(chunk)
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position == len(buffer):
+                break
+            if not started:
+                if buffer[position] != "[":
+                    raise ValueError(
+                        f"expected a JSON array, found {buffer[position]!r}"
+                    )
+                started = True
+                position += 1
+                continue
+            if buffer[position] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # the item is not complete yet, wait for more of the body
+                break
+            if end == len(buffer):
+                # a trailing value may be cut short, wait for the next chunk
+                break
+            yield item
+            position = end
+        buffer = buffer[position:]
+    raise ValueError("JSON array ended early")
+
+
+def fetch_organisms(session):
+    r = session.get_api("/api/v1/organisms", params={"studyGoldId": study_gold_id})
+    return {organism["organismGoldId"]: organism["ncbiTaxId"] for organism in r.json()}
+
+
+def write_projects(session, organisms, writer):
+    """Stream the study projects and write a row for each whole genome one.
+
+    If the connection drops part way, the projects are requested again and the
+    ones already handled are skipped, so the rows written so far are kept.
+    """
+    seen = 0
+    for attempt in range(1, retries + 1):
+        try:
+            with session.get_api(
+                "/api/v1/projects", params={"studyGoldId": study_gold_id}, stream=True
+            ) as r:
+                for index, project in enumerate(iter_json_array(r)):
+                    if index < seen:
+                        continue
+                    if project["sequencingStrategy"] == "Whole Genome Sequencing":
+                        d = [project.get(f) for f in fieldnames]
+                        # waits for the organisms the first time only
+                        organism = organisms.result()[project["organismGoldId"]]
+                        writer.writerow(d + [organism])
+                    seen += 1
+            return
+        except (requests.RequestException, ValueError) as e:
+            if attempt == retries or organisms.done() and organisms.exception():
+                raise
+            print(f"Error {e} reading projects, resuming after {seen} projects")
+
+
+def main(output_filename, offline_token):
+    session = GoldSession(offline_token)
+    try:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            organisms = executor.submit(fetch_organisms, session)
+            with open(f"{output_filename}.tmp", "w") as output_file:
+                writer = csv.writer(output_file, delimiter="\t", lineterminator="\n")
+                writer.writerow(fieldnames + ["ncbiTaxId"])
+                write_projects(session, organisms, writer)
+                organisms.result()
+    except Exception:
+        # only complete files are left in the output directory
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(f"{output_filename}.tmp")
+        raise
+    os.replace(f"{output_filename}.tmp", output_filename)
+
+
+if __name__ == "__main__":
+    output_filename = f"{sys.argv[1]}/jgi_1kfg.tsv"
     try:
-        open(f"{output_filename}.failed", "x")
-    except FileExistsError:
-        sys.exit(1)
+        main(output_filename, sys.argv[2])
+    except Exception:
+        print(f"something has gone wrong: {output_filename}")
+        try:
+            open(f"{output_filename}.failed", "x")
+        except FileExistsError:
+            sys.exit(1)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Merge the expanded status lists of all projects into one table.
+
+Reads every `{acronym}_expanded.tsv` in a directory and writes a single table
+with one row per `ncbi_taxon_id`, sorted by taxon ID, so the importer can read
+one file instead of one per project. Each status column lists the acronyms of
+every project that sets it for the taxon. Row-level differences against the
+previous merge are reported, and written to a file with `--diff`.
+
+Usage:
+    python scripts/merge_status_lists.py resources/status-lists \
+        [-o status_lists_merged.tsv] [--previous FILE] [--diff FILE]
+"""
+
+import argparse
+import glob
+import os
+import sys
+
+import import_status_lib as isl
+
+MERGED_FILE = "status_lists_merged.tsv"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("dir", help="directory of expanded status list TSV files")
+    parser.add_argument(
+        "-o", "--output", help=f"merged output file (default DIR/{MERGED_FILE})"
+    )
+    parser.add_argument(
+        "--previous",
+        help=f"previous merge to compare against (default DIR/{MERGED_FILE})",
+    )
+    parser.add_argument("--diff", help="write the row-level differences to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    output = args.output or os.path.join(args.dir, MERGED_FILE)
+    previous = args.previous or os.path.join(args.dir, MERGED_FILE)
+    file_names = sorted(glob.glob(os.path.join(args.dir, "*_expanded.tsv")))
+    if not file_names:
+        sys.exit(f"no expanded status lists found in {args.dir}")
+    for failed in sorted(glob.glob(os.path.join(args.dir, "*_expanded.tsv.failed"))):
+        print(f"warning: {os.path.basename(failed)[:-7]} failed and is not merged")
+
+    print(f"merging {len(file_names)} status lists ...")
+    merged_table = isl.merge_status_tables(
+        isl.read_expanded_tsv(file_name) for file_name in file_names
+    )
+    print(f"merged {len(merged_table)} taxa")
+
+    if os.path.exists(previous):
+        diff = isl.diff_status_tables(
+            isl.read_merged_status_table(previous), merged_table
+        )
+        counts = diff["change"].value_counts()
+        print(
+            "changes since the previous merge:",
+            ", ".join(
+                f"{counts.get(change, 0)} {change}"
+                for change in ("added", "removed", "changed")
+            ),
+        )
+        if args.diff:
+            diff.to_csv(args.diff, sep="\t", index=False)
+    else:
+        print(f"no previous merge at {previous}, not reporting changes")
+
+    print(f"saving merged status lists to {output}")
+    isl.write_merged_status_table(merged_table, output)
+
+
+if __name__ == "__main__":
+    main()
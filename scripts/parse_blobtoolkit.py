@@ -1,32 +1,119 @@
 #!/usr/bin/env python3
 """BlobToolKit functions."""
 
-
+import codecs
 import contextlib
+import json
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-import ujson
-from tolkein import tofetch, tolog
+import requests
+from tolkein import tolog
 
 LOGGER = tolog.logger(__name__)
 
 BTK_API = "https://blobtoolkit.genomehubs.org/api/v1"
 BTK_VIEW = "https://blobtoolkit.genomehubs.org/view"
-
-
-def fetch_btk_datasets(root):
-    """Fetch BlobToolKit taxon entries."""
-    url = f"{BTK_API}/search/{root}"
-    page = tofetch.fetch_url(url)
-    return ujson.decode(page)
+BTK_CHUNK_SIZE = 65536
+BTK_QUEUE_SIZE = 1000
+BTK_WORKERS = 4
+
+
+def iter_json_array(chunks):
+    """Decode JSON array elements one at a time from an iterable of byte chunks.
+
+    Raises ValueError if the body is not a JSON array or ends before the array is
+    closed, so a truncated response is not taken for a complete one.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    pos = 0
+    started = False
+    for chunk in chunks:
+        buffer = buffer[pos:] + utf8.decode(chunk)
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buffer):
+                break
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError(f"expected a JSON array, found {buffer[pos]!r}")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                obj, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break
+            if end == len(buffer):
+                # a trailing value may be cut short, wait for the next chunk
+                break
+            yield obj
+            pos = end
+    raise ValueError("JSON array ended early")
 
 
 def stream_btk_datasets(root="Eukaryota"):
     """Stream BlobToolKit taxon entries."""
-    if datasets := fetch_btk_datasets(root):
-        for dataset in datasets:
+    url = f"{BTK_API}/search/{root}"
+    with requests.get(url, stream=True) as res:
+        if not res.ok:
+            LOGGER.warning("Unable to fetch %s: %s", url, res.status_code)
+            return
+        for dataset in iter_json_array(res.iter_content(BTK_CHUNK_SIZE)):
             yield dataset["id"], dataset
 
 
+def queue_btk_datasets(root, datasets, stop):
+    """Stream BlobToolKit taxon entries for a root into a queue."""
+    try:
+        for entry in stream_btk_datasets(root):
+            if stop.is_set():
+                break
+            datasets.put(entry)
+    finally:
+        datasets.put(None)
+
+
+def stream_unique_btk_datasets(roots, workers=BTK_WORKERS):
+    """Stream BlobToolKit taxon entries for several roots, skipping duplicates.
+
+    Roots are fetched concurrently, each into its own bounded queue, and entries
+    are yielded in root order so the output does not depend on fetch timing.
+    """
+    seen = set()
+    queues = [queue.Queue(maxsize=BTK_QUEUE_SIZE) for _ in roots]
+    stop = threading.Event()
+    done = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(roots)))) as pool:
+        futures = [
+            pool.submit(queue_btk_datasets, root, datasets, stop)
+            for root, datasets in zip(roots, queues)
+        ]
+        try:
+            for future, datasets in zip(futures, queues):
+                while (entry := datasets.get()) is not None:
+                    key, meta = entry
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    yield key, meta
+                done += 1
+                future.result()
+        finally:
+            # unblock any fetches still running if the consumer stops early
+            stop.set()
+            for datasets in queues[done:]:
+                while datasets.get() is not None:
+                    pass
+
+
 def extract_btk_stats(meta):
     """Extract BlobToolKit stats to top level."""
     summaryStats = meta.pop("summaryStats", {})
@@ -63,7 +150,6 @@ def describe_btk_files(meta):
         plots.append("blob")
     files = []
     for plot in plots:
-        print(plots)
         if plot == "blob":
             url = f'{BTK_API}/image/{meta["id"]}/{plot}/circle?format=png'
         else:
@@ -95,18 +181,21 @@ def describe_btk_files(meta):
     return files
 
 
+def stream_btk_rows(roots, workers=BTK_WORKERS):
+    """Stream parsed BlobToolKit assemblies and their analysis files."""
+    for _, meta in stream_unique_btk_datasets(roots, workers):
+        files = describe_btk_files(meta)
+        extract_btk_stats(meta)
+        yield meta, files
+
+
 def btk_parser(_params, opts, *args, **kwargs):
     """Parse BlobToolKit assemblies."""
     parsed = []
     analyses = []
-    print(opts)
-    for root in opts["btk-root"]:
-        for key, meta in stream_btk_datasets(root):
-            print(key)
-            files = describe_btk_files(meta)
-            analyses += files
-            extract_btk_stats(meta)
-            parsed.append(meta)
+    for meta, files in stream_btk_rows(opts["btk-root"]):
+        analyses.extend(files)
+        parsed.append(meta)
     return (parsed, analyses)
 
 
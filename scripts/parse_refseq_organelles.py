@@ -7,13 +7,20 @@ Parse RefSeq collection records for organelle sequences.
 import argparse
 import contextlib
 import gzip
+import http.client
+import json
 import os
 import re
-from collections import Counter
-from typing import Optional
-from urllib.error import ContentTooShortError
+import urllib.request
+import zlib
+from collections import deque
+from collections.abc import Generator, Iterable
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain
+from typing import BinaryIO, Optional
+from urllib.error import ContentTooShortError, HTTPError
 
-from Bio import SeqIO, SeqRecord
+import numpy as np
 from genomehubs import utils as gh_utils
 from tolkein import tofetch, tolog
 from tqdm import tqdm
@@ -22,20 +29,73 @@ LOGGER = tolog.logger(__name__)
 
 REFSEQ_FTP = "https://ftp.ncbi.nlm.nih.gov/refseq/release"
 
+GENBANK_INDENT = 12
+FEATURE_QUALIFIER_INDENT = 21
+SEQUENCE_DELETE = b" \t\r\n0123456789"
+TOP_LEVEL_TAXA = (
+    "Bacteria.",
+    "Archaea.",
+    "Eukaryota.",
+    "Unclassified.",
+    "Viruses.",
+    "cellular organisms.",
+    "other sequences.",
+    "unclassified sequences.",
+)
+
+
+class FlatfileReference:
+    """Reference details read from a GenBank REFERENCE block."""
+
+    __slots__ = ("authors", "consrtm", "title", "journal", "pubmed_id")
+
+    def __init__(self) -> None:
+        self.authors = ""
+        self.consrtm = ""
+        self.title = ""
+        self.journal = ""
+        self.pubmed_id = ""
+
+
+class FlatfileFeature:
+    """Qualifiers read from a GenBank feature."""
+
+    __slots__ = ("qualifiers",)
+
+    def __init__(self, qualifiers: dict[str, list[str]]) -> None:
+        self.qualifiers = qualifiers
+
+
+class FlatfileRecord:
+    """Header-level view of a GenBank record.
+
+    Provides the subset of the BioPython SeqRecord interface used by the parse_*
+    functions in this module, so either type of record can be passed to them.
+    Only the first feature (the source feature) is kept.
+    """
+
+    __slots__ = ("id", "description", "annotations", "dbxrefs", "features", "seq")
+
+    def __init__(self) -> None:
+        self.id: Optional[str] = None
+        self.description = ""
+        self.annotations: dict = {}
+        self.dbxrefs: list[str] = []
+        self.features: list[FlatfileFeature] = []
+        self.seq = b""
 
-def refseq_listing(collection: str, min_date: str, retries: int = 5) -> list:
-    """Fetch a directory listing for a RefSeq collection.
+
+def refseq_release(collection: str, retries: int = 5) -> list[tuple[str, str]]:
+    """Fetch a directory listing for a RefSeq collection with file dates.
 
     Args:
         collection (str): The RefSeq collection to fetch the listing for.
-        min_date (str, optional): The minimum date to include in the listing, in the
-            format "YYYY-MM-DD". If None, all files will be included.
         retries (int, optional): The number of times to retry the fetch if it fails.
             Defaults to 5.
 
     Returns:
-        list: A list of URLs for the files in the RefSeq collection that match the
-            minimum date.
+        list[tuple[str, str]]: A list of (URL, date) pairs for the files in the
+            RefSeq collection, with dates in the format "YYYY-MM-DD".
     """
     pattern = re.compile(r"(\w+\.\d+\.genomic\.gbff\.gz).+(\d{4}-\d{2}-\d{2})")
     url = f"{REFSEQ_FTP}/{collection}"
@@ -43,19 +103,147 @@ def refseq_listing(collection: str, min_date: str, retries: int = 5) -> list:
         with contextlib.suppress(ContentTooShortError):
             html = tofetch.fetch_url(url)
             break
-    listing = []
+    release = []
     for line in html.split("\n"):
         if match := pattern.search(line):
-            if min_date is None or match[2] > min_date:
-                listing.append(f"{url}/{match[1]}")
-    return listing
+            release.append((f"{url}/{match[1]}", match[2]))
+    return release
+
+
+def refseq_listing(collection: str, min_date: str, retries: int = 5) -> list:
+    """Fetch a directory listing for a RefSeq collection.
+
+    Args:
+        collection (str): The RefSeq collection to fetch the listing for.
+        min_date (str, optional): The minimum date to include in the listing, in the
+            format "YYYY-MM-DD". If None, all files will be included.
+        retries (int, optional): The number of times to retry the fetch if it fails.
+            Defaults to 5.
+
+    Returns:
+        list: A list of URLs for the files in the RefSeq collection that match the
+            minimum date.
+    """
+    return [
+        url
+        for url, date in refseq_release(collection, retries)
+        if min_date is None or date > min_date
+    ]
+
+
+def remote_validator(url: str, retries: int = 5) -> Optional[str]:
+    """Fetch a validator identifying the current version of a remote file.
+
+    Args:
+        url (str): The URL of the remote file.
+        retries (int, optional): The number of times to retry the request if it
+            fails. Defaults to 5.
+
+    Returns:
+        Optional[str]: The Last-Modified header, or the Content-Length header if the
+            server does not send one. None if neither could be fetched.
+    """
+    request = urllib.request.Request(url, method="HEAD")
+    for _ in range(retries):
+        with contextlib.suppress(OSError):
+            with urllib.request.urlopen(request) as response:
+                return response.headers.get("Last-Modified") or response.headers.get(
+                    "Content-Length"
+                )
+    return None
+
+
+def cache_path(cache_dir: str, url: str, organelle: str) -> str:
+    """Get the path to the cached rows for a flatfile URL.
 
+    Args:
+        cache_dir (str): The root directory of the parse cache.
+        url (str): The URL of the flatfile.
+        organelle (str): The type of organelle parsed from the flatfile.
+
+    Returns:
+        str: The path to the cache entry.
+    """
+    return os.path.join(cache_dir, organelle, f"{os.path.basename(url)}.json")
+
+
+def load_cached_rows(
+    cache_dir: str, url: str, organelle: str, validator: str, options: dict
+) -> Optional[list[dict]]:
+    """Load cached rows for a flatfile if they match its current version.
+
+    Args:
+        cache_dir (str): The root directory of the parse cache.
+        url (str): The URL of the flatfile.
+        organelle (str): The type of organelle parsed from the flatfile.
+        validator (str): The current validator for the remote file.
+        options (dict): The parse options the rows must have been produced with.
+
+    Returns:
+        Optional[list[dict]]: The cached rows, or None if there is no valid entry.
+    """
+    try:
+        with open(cache_path(cache_dir, url, organelle)) as fh:
+            entry = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if (
+        entry.get("url") != url
+        or entry.get("validator") != validator
+        or entry.get("options") != options
+    ):
+        return None
+    return entry.get("rows")
 
-def parse_references(entry: SeqRecord.SeqRecord, fields: dict = None) -> dict:
-    """Parse references from a BioPython SeqRecord entry.
+
+def save_cached_rows(
+    cache_dir: str,
+    url: str,
+    organelle: str,
+    validator: str,
+    options: dict,
+    rows: list[dict],
+) -> None:
+    """Save parsed rows for a flatfile to the parse cache.
 
     Args:
-        entry (Bio.SeqRecord.SeqRecord): The SeqRecord entry to parse references from.
+        cache_dir (str): The root directory of the parse cache.
+        url (str): The URL of the flatfile.
+        organelle (str): The type of organelle parsed from the flatfile.
+        validator (str): The validator for the version of the file that was parsed.
+        options (dict): The parse options used to produce the rows.
+        rows (list[dict]): The parsed rows.
+    """
+    path = cache_path(cache_dir, url, organelle)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    entry = {"url": url, "validator": validator, "options": options, "rows": rows}
+    with open(f"{path}.tmp", "w") as fh:
+        json.dump(entry, fh)
+    os.replace(f"{path}.tmp", path)
+
+
+def evict_cache(cache_dir: str, organelle: str, release: list[str]) -> None:
+    """Remove cache entries for files that are no longer in a RefSeq release.
+
+    Args:
+        cache_dir (str): The root directory of the parse cache.
+        organelle (str): The RefSeq collection the release listing belongs to.
+        release (list[str]): The URLs of all files in the current release.
+    """
+    keep = {os.path.basename(cache_path(cache_dir, url, organelle)) for url in release}
+    with contextlib.suppress(FileNotFoundError):
+        for file_name in os.listdir(os.path.join(cache_dir, organelle)):
+            if file_name not in keep:
+                LOGGER.info("Evicting cached rows for %s", file_name)
+                os.remove(os.path.join(cache_dir, organelle, file_name))
+
+
+def parse_references(entry: FlatfileRecord, fields: dict = None) -> dict:
+    """Parse references from a GenBank record.
+
+    Args:
+        entry (FlatfileRecord): The record to parse references from. A BioPython
+            SeqRecord may also be used.
         fields (dict, optional): A dictionary to store the parsed reference fields in.
             If not provided, a new dictionary will be created.
 
@@ -92,11 +280,12 @@ def parse_references(entry: SeqRecord.SeqRecord, fields: dict = None) -> dict:
     return fields
 
 
-def parse_xrefs(entry: SeqRecord.SeqRecord, fields: dict = None) -> dict:
-    """Parse cross-references (xrefs) from a BioPython SeqRecord entry.
+def parse_xrefs(entry: FlatfileRecord, fields: dict = None) -> dict:
+    """Parse cross-references (xrefs) from a GenBank record.
 
     Args:
-        entry (Bio.SeqRecord.SeqRecord): The SeqRecord entry to parse xrefs from.
+        entry (FlatfileRecord): The record to parse xrefs from. A BioPython
+            SeqRecord may also be used.
         fields (dict, optional): A dictionary to store the parsed xref fields in.
             If not provided, a new dictionary will be created.
 
@@ -125,12 +314,13 @@ def parse_xrefs(entry: SeqRecord.SeqRecord, fields: dict = None) -> dict:
 
 
 def parse_features(
-    entry: SeqRecord.SeqRecord, fields: dict[str, str] = None
+    entry: FlatfileRecord, fields: dict[str, str] = None
 ) -> dict[str, str]:
-    """Parse feature information from a BioPython SeqRecord entry.
+    """Parse feature information from a GenBank record.
 
     Args:
-        entry (Bio.SeqRecord.SeqRecord): The SeqRecord entry to parse features from.
+        entry (FlatfileRecord): The record to parse features from. A BioPython
+            SeqRecord may also be used.
         fields (dict, optional): A dictionary to store the parsed feature fields in.
             If not provided, a new dictionary will be created.
 
@@ -180,14 +370,31 @@ def reformat_date(string: str) -> str:
     return f"{parts[2]}-{months[parts[1]]}-{parts[0].zfill(2)}"
 
 
-def parse_sequence(entry: SeqRecord.SeqRecord, fields: dict) -> bool:
+def count_bases(sequence: bytes) -> tuple[int, int, int]:
+    """
+    Counts N, GC and AT bases in a sequence, ignoring case.
+
+    Args:
+        sequence (bytes): The raw sequence bytes.
+
+    Returns:
+        tuple[int, int, int]: The N count, the GC count and the AT count.
+    """
+    counts = np.bincount(np.frombuffer(sequence, dtype=np.uint8), minlength=256)
+    n_count = counts[ord("N")] + counts[ord("n")]
+    gc_count = counts[ord("G")] + counts[ord("C")] + counts[ord("g")] + counts[ord("c")]
+    at_count = counts[ord("A")] + counts[ord("T")] + counts[ord("a")] + counts[ord("t")]
+    return int(n_count), int(gc_count), int(at_count)
+
+
+def parse_sequence(entry: FlatfileRecord, fields: dict) -> bool:
     """
-    Parses the sequence information from the provided SeqRecord entry and
+    Parses the sequence information from the provided GenBank record and
     updates the given fields dictionary.
 
     Args:
-        entry (Bio.SeqRecord.SeqRecord): The SeqRecord entry to parse sequence
-            information from.
+        entry (FlatfileRecord): The record to parse sequence information from. A
+            BioPython SeqRecord may also be used.
         fields (dict): A dictionary to store the parsed sequence information
             in. This dictionary will be updated in-place.
 
@@ -195,118 +402,668 @@ def parse_sequence(entry: SeqRecord.SeqRecord, fields: dict) -> bool:
         bool: True if the sequence was successfully parsed, False if the
             sequence is entirely 'N' characters.
     """
-    seqstr = str(entry.seq.upper())
-    counter = Counter(seqstr)
-    length = len(seqstr)
-    fields["nPercent"] = float("%.2f" % (counter["N"] / length * 100))
+    sequence = entry.seq if isinstance(entry.seq, bytes) else bytes(entry.seq)
+    n_count, gc_count, at_count = count_bases(sequence)
+    length = len(sequence)
+    fields["nPercent"] = float("%.2f" % (n_count / length * 100))
     if fields["nPercent"] == 100:
         return False
-    gc_count = counter["G"] + counter["C"]
-    fields["gcPercent"] = float(
-        "%.2f" % (gc_count / (gc_count + counter["A"] + counter["T"]) * 100)
-    )
+    fields["gcPercent"] = float("%.2f" % (gc_count / (gc_count + at_count) * 100))
     fields["assemblySpan"] = length
     return True
 
 
-def parse_flatfile(
-    flatfile: str, organelle: str, args: argparse.Namespace
+def split_header_blocks(lines: list[str]) -> list[tuple[str, list[str]]]:
+    """Split GenBank header lines into keyword blocks.
+
+    Args:
+        lines (list[str]): Header lines, without trailing whitespace.
+
+    Returns:
+        list[tuple[str, list[str]]]: A list of (keyword, values) tuples, where the
+            first value is the stripped data from the keyword line and any further
+            values are the continuation lines for that keyword.
+    """
+    blocks: list[tuple[str, list[str]]] = []
+    for line in lines:
+        if not line:
+            continue
+        if key := line[:GENBANK_INDENT].strip():
+            blocks.append((key, [line[GENBANK_INDENT:].strip()]))
+        elif blocks:
+            blocks[-1][1].append(line[GENBANK_INDENT:])
+    return blocks
+
+
+def split_taxonomy(lineage: str) -> list[str]:
+    """Split a GenBank lineage string into a list of taxon names.
+
+    Args:
+        lineage (str): The semicolon-separated lineage from an ORGANISM block.
+
+    Returns:
+        list[str]: The taxon names in the lineage.
+    """
+    if not lineage or lineage == ".":
+        return []
+    if lineage.endswith("."):
+        lineage = lineage[:-1]
+    return [item.strip() for item in lineage.split(";") if item]
+
+
+def parse_organism_block(values: list[str], annotations: dict) -> None:
+    """Parse the organism name and lineage from a GenBank ORGANISM block.
+
+    The organism name may wrap onto several lines, so lineage lines are recognised
+    by the presence of semicolons or a top-level taxon name.
+
+    Args:
+        values (list[str]): The lines of the ORGANISM block.
+        annotations (dict): The annotations dictionary to update in-place.
+    """
+    organism = values[0]
+    lineage = ""
+    for value in values[1:]:
+        if lineage or ";" in value or value.strip() in TOP_LEVEL_TAXA:
+            lineage += f" {value}"
+        elif value.strip() != ".":
+            organism += f" {value.strip()}"
+    annotations["organism"] = organism
+    annotations.setdefault("taxonomy", []).extend(split_taxonomy(lineage.strip()))
+
+
+def parse_comment_block(values: list[str], annotations: dict) -> None:
+    """Parse free-text comment lines from a GenBank COMMENT block.
+
+    Structured comment tables are skipped so the comment matches the one reported
+    by BioPython.
+
+    Args:
+        values (list[str]): The lines of the COMMENT block.
+        annotations (dict): The annotations dictionary to update in-place.
+    """
+    start_re = re.compile(r"([^#]+)-START##$")
+    comment: list[str] = []
+    structured = start_re.search(values[0]) is not None
+    if not structured:
+        comment.append(values[0])
+    for value in values[1:]:
+        if "-START##" in value:
+            if start_re.search(value):
+                structured = True
+            else:
+                comment.append(value)
+        elif structured and ("::" in value or "-END##" not in value):
+            continue
+        elif "-END##" in value:
+            structured = False
+        else:
+            comment.append(value)
+    if comment:
+        if "comment" in annotations:
+            annotations["comment"] += "\n" + "\n".join(comment)
+        else:
+            annotations["comment"] = "\n".join(comment)
+
+
+def parse_dblink_block(values: list[str], record: FlatfileRecord) -> None:
+    """Parse database cross-references from a GenBank DBLINK block.
+
+    Args:
+        values (list[str]): The lines of the DBLINK block.
+        record (FlatfileRecord): The record to add dbxrefs to.
+    """
+    links: list[str] = []
+    for value in values:
+        if links and ":" not in value:
+            links[-1] += f" {value.strip()}"
+        else:
+            links.append(value.strip())
+    for link in links:
+        while ": " in link:
+            link = link.replace(": ", ":")
+        if link.strip() not in record.dbxrefs:
+            record.dbxrefs.append(link.strip())
+
+
+def parse_header_lines(lines: list[str], record: FlatfileRecord) -> None:
+    """Parse the header section of a GenBank record.
+
+    Only the blocks needed to populate RefSeq organelle fields are read, i.e.
+    LOCUS, DEFINITION, ACCESSION, VERSION, DBLINK, REFERENCE, ORGANISM and
+    COMMENT.
+
+    Args:
+        lines (list[str]): The header lines, from LOCUS up to FEATURES.
+        record (FlatfileRecord): The record to update in-place.
+    """
+    reference = None
+    for key, values in split_header_blocks(lines):
+        if key == "LOCUS":
+            record.annotations["date"] = values[0].split()[-1]
+            continue
+        data = " ".join(values)
+        if key == "DEFINITION":
+            record.description = data[:-1] if data.endswith(".") else data
+        elif key == "ACCESSION":
+            if record.id is None and data.split():
+                record.id = data.split()[0]
+        elif key == "VERSION":
+            while "  " in data:
+                data = data.replace("  ", " ")
+            if version := data.split(" GI:")[0].strip():
+                record.id = version
+        elif key == "DBLINK":
+            parse_dblink_block(values, record)
+        elif key == "REFERENCE":
+            reference = FlatfileReference()
+            record.annotations.setdefault("references", []).append(reference)
+        elif key in ("AUTHORS", "CONSRTM", "TITLE", "JOURNAL"):
+            if reference is not None:
+                attr = key.lower()
+                previous = getattr(reference, attr)
+                setattr(reference, attr, f"{previous} {data}" if previous else data)
+        elif key == "PUBMED":
+            if reference is not None:
+                reference.pubmed_id = data
+        elif key == "ORGANISM":
+            parse_organism_block(values, record.annotations)
+        elif key == "COMMENT":
+            parse_comment_block(values, record.annotations)
+
+
+def parse_qualifier_lines(lines: list[str]) -> dict[str, list[str]]:
+    """Parse the qualifiers of a GenBank feature.
+
+    Args:
+        lines (list[str]): The stripped qualifier lines of the feature, excluding
+            the location.
+
+    Returns:
+        dict[str, list[str]]: A dictionary of qualifier values, with quotes removed
+            and multi-line values joined with spaces.
+    """
+    parsed: list[list] = []
+    quoted = False
+    for line in lines:
+        if quoted:
+            parsed[-1][1] += f" {line}"
+            quoted = not line.endswith('"')
+        elif line.startswith("/"):
+            key, sep, value = line[1:].partition("=")
+            if not sep:
+                parsed.append([key, None])
+                continue
+            value = value.lstrip() if value.lstrip().startswith('"') else value
+            parsed.append([key, value])
+            quoted = len(value) > 1 and value[0] == '"' and value[-1] != '"'
+        elif parsed and parsed[-1][1] is not None:
+            parsed[-1][1] += f" {line}"
+    qualifiers: dict[str, list[str]] = {}
+    for key, value in parsed:
+        if value is None:
+            qualifiers.setdefault(key, [""])
+            continue
+        if len(value) > 1 and value[0] == '"' and value[-1] == '"':
+            value = value[1:-1]
+        qualifiers.setdefault(key, []).append(value.replace('""', '"'))
+    return qualifiers
+
+
+def lineage_includes(lines: list[str], root_taxon: str) -> bool:
+    """Check whether the lineage in a GenBank ORGANISM block includes a taxon.
+
+    Args:
+        lines (list[str]): The lines of the ORGANISM block.
+        root_taxon (str): The taxon name to look for.
+
+    Returns:
+        bool: True if the taxon is in the lineage.
+    """
+    annotations: dict = {}
+    for _, values in split_header_blocks(lines):
+        parse_organism_block(values, annotations)
+    return root_taxon in annotations.get("taxonomy", [])
+
+
+def scan_flatfile(
+    fh: BinaryIO, root_taxon: Optional[str] = None
+) -> Generator[FlatfileRecord, None, None]:
+    """Stream header-level records from a GenBank flatfile.
+
+    This is a lightweight alternative to `SeqIO.parse(fh, "gb")` that reads the
+    header blocks, the qualifiers of the first (source) feature and the ORIGIN
+    sequence, skipping all other features without tokenising them.
+
+    If a root taxon is given, the lineage is checked as soon as the ORGANISM block
+    has been read and records outside the root taxon are skipped up to the next
+    `//` line without parsing anything else.
+
+    Args:
+        fh (BinaryIO): A binary file handle for the GenBank flatfile.
+        root_taxon (str, optional): A taxon name that must be in the lineage of
+            each record. Defaults to None.
+
+    Yields:
+        FlatfileRecord: A record for each entry in the flatfile.
+    """
+    record = None
+    header: list[str] = []
+    source: list[str] = []
+    sequence: list[bytes] = []
+    organism = None
+    checked = False
+    state = None
+    for raw in fh:
+        if state == "origin":
+            if raw.startswith(b"//"):
+                record.seq = b"".join(sequence).translate(None, SEQUENCE_DELETE)
+                yield record
+                state = None
+            else:
+                sequence.append(raw)
+            continue
+        if raw.startswith(b"LOCUS"):
+            record = FlatfileRecord()
+            header = [raw.decode("utf-8", "replace").rstrip()]
+            source = []
+            sequence = []
+            organism = None
+            checked = root_taxon is None
+            state = "header"
+            continue
+        if state is None:
+            continue
+        if state == "skip":
+            if raw.startswith(b"//"):
+                state = None
+            continue
+        if state == "header":
+            if not checked:
+                if organism is not None and raw[:GENBANK_INDENT].strip():
+                    checked = lineage_includes(header[organism:], root_taxon)
+                    if not checked:
+                        state = None if raw.startswith(b"//") else "skip"
+                        continue
+                elif raw.startswith(b"  ORGANISM"):
+                    organism = len(header)
+                elif raw.startswith((b"FEATURES", b"ORIGIN", b"CONTIG", b"//")):
+                    state = None if raw.startswith(b"//") else "skip"
+                    continue
+            if not raw.startswith((b"FEATURES", b"ORIGIN", b"CONTIG", b"//")):
+                header.append(raw.decode("utf-8", "replace").rstrip())
+                continue
+            parse_header_lines(header, record)
+            state = "features"
+            if raw.startswith(b"FEATURES"):
+                continue
+        elif state == "features" and raw.startswith(b"     "):
+            line = raw.decode("utf-8", "replace").rstrip()
+            if line[:FEATURE_QUALIFIER_INDENT].strip():
+                state = "source"
+            continue
+        elif state == "source":
+            if not raw[:FEATURE_QUALIFIER_INDENT].strip():
+                source.append(raw.decode("utf-8", "replace").strip())
+                continue
+            record.features = [FlatfileFeature(parse_qualifier_lines(source))]
+            state = "features_done"
+        if raw.startswith(b"ORIGIN"):
+            state = "origin"
+        elif raw.startswith(b"//"):
+            yield record
+            state = None
+
+
+def projection_paths(config: dict) -> dict:
+    """Build a tree of the record keys referenced by a types config.
+
+    Args:
+        config (dict): The loaded YAML configuration.
+
+    Returns:
+        dict: A nested dictionary of keys, with an empty dictionary marking the end
+            of each configured path.
+    """
+    tree: dict = {}
+    for path, _ in gh_utils.get_path_header(config):
+        node = tree
+        for key in path.split("."):
+            node = node.setdefault(key, {})
+    return tree
+
+
+def project_fields(fields: dict, projection: dict) -> dict:
+    """Keep only the fields referenced by a projection tree.
+
+    Args:
+        fields (dict): A dictionary containing the parsed data for a record.
+        projection (dict): A tree of keys as returned by `projection_paths`.
+
+    Returns:
+        dict: A new dictionary containing only the projected fields.
+    """
+    projected = {}
+    for key, children in projection.items():
+        if key not in fields:
+            continue
+        value = fields[key]
+        if children and isinstance(value, dict):
+            value = project_fields(value, children)
+        projected[key] = value
+    return projected
+
+
+def stream_records(
+    url: str, root_taxon: Optional[str] = None, retries: int = 5
+) -> Generator[FlatfileRecord, None, None]:
+    """Stream GenBank records from a remote gzipped flatfile.
+
+    The response body is decompressed as it arrives and fed straight into
+    `scan_flatfile`, so nothing is written to disk. If the transfer is truncated,
+    the connection fails or the server returns a 5xx error, the file is requested
+    again and records that have already been yielded are skipped. Client errors
+    such as 404 are raised straight away.
+
+    Args:
+        url (str): The URL of the gzipped GenBank flatfile.
+        root_taxon (str, optional): Only yield records with this taxon in their
+            lineage.
+        retries (int, optional): The number of times to retry a truncated or
+            failed transfer. Defaults to 5.
+
+    Yields:
+        FlatfileRecord: A record for each entry in the flatfile.
+    """
+    yielded = 0
+    for attempt in range(retries + 1):
+        skip = yielded
+        try:
+            with urllib.request.urlopen(url) as response, gzip.GzipFile(
+                fileobj=response
+            ) as fh:
+                for entry in scan_flatfile(fh, root_taxon):
+                    if skip:
+                        skip -= 1
+                        continue
+                    yielded += 1
+                    yield entry
+            return
+        except HTTPError as err:
+            if err.code < 500 or attempt == retries:
+                raise
+            LOGGER.warning("Retrying %s after server error: %s", url, err)
+        except (EOFError, OSError, zlib.error, http.client.HTTPException) as err:
+            if attempt == retries:
+                raise
+            LOGGER.warning("Retrying truncated transfer of %s: %s", url, err)
+
+
+def parse_records(
+    records: Iterable[FlatfileRecord],
+    organelle: str,
+    args: argparse.Namespace,
+    projection: Optional[dict] = None,
 ) -> list[dict]:
-    """Parse a GenBank flatfile.
+    """Parse GenBank records.
 
     Args:
-        flatfile (str): The path to the GenBank flatfile to parse.
-        organelle (str): The type of organelle to parse from the flatfile.
+        records (Iterable[FlatfileRecord]): The records to parse.
+        organelle (str): The type of organelle to parse from the records.
         args (argparse.Namespace): Command-line arguments passed to the script.
+        projection (dict, optional): A tree of keys as returned by
+            `projection_paths`. If set, only these fields are kept for each record.
 
     Returns:
-        list[dict]: A list of dictionaries containing the parsed data from the flatfile.
+        list[dict]: A list of dictionaries containing the parsed data from the
+            records.
     """
     data: list[dict] = []
     comment_re = re.compile(
         r"(?:derived|identical)\s(?:from|to)\s([\w\d]+).*COMPLETENESS: full length",
         re.DOTALL,
     )
-    with gzip.open(flatfile, "rt") as fh:
-        gb = SeqIO.parse(fh, "gb")
-        for entry in tqdm(gb, mininterval=args.log_interval):
-            if (
-                args.root_taxon is not None
-                and args.root_taxon not in entry.annotations["taxonomy"]
-            ):
+    for entry in tqdm(records, mininterval=args.log_interval):
+        fields: dict = {
+            "id": entry.id,
+            "organelle": organelle,
+            "annotations": entry.annotations,
+        }
+        if comment := entry.annotations.get("comment", ""):
+            if match := comment_re.search(comment):
+                fields["genbankAccession"] = match[1]
+            else:
                 continue
-            fields: dict = {
-                "id": entry.id,
-                "organelle": organelle,
-                "annotations": entry.annotations,
-            }
-            if comment := entry.annotations.get("comment", ""):
-                if match := comment_re.search(comment):
-                    fields["genbankAccession"] = match[1]
-                else:
-                    continue
-            parse_features(entry, fields)
-            parse_references(entry, fields)
-            fields["releaseDate"] = reformat_date(entry.annotations["date"])
-            parse_xrefs(entry, fields)
-            try:
-                if not parse_sequence(entry, fields):
-                    continue
-            except Exception:
-                LOGGER.warning("Unable to read sequence for %s", entry.id)
+        parse_features(entry, fields)
+        parse_references(entry, fields)
+        fields["releaseDate"] = reformat_date(entry.annotations["date"])
+        parse_xrefs(entry, fields)
+        try:
+            if not parse_sequence(entry, fields):
                 continue
-            fields[organelle] = fields
-            data.append(fields)
+        except Exception:
+            LOGGER.warning("Unable to read sequence for %s", entry.id)
+            continue
+        fields[organelle] = fields
+        if projection is not None:
+            fields = project_fields(fields, projection)
+        data.append(fields)
     return data
 
 
-def parse_listing(
-    listing: list[str], organelle: str, args: argparse.Namespace
+def parse_flatfile(
+    flatfile: str,
+    organelle: str,
+    args: argparse.Namespace,
+    projection: Optional[dict] = None,
 ) -> list[dict]:
-    """Parse all URLs in a directory listing.
+    """Parse a GenBank flatfile.
 
     Args:
-        listing (list[str]): A list of URLs to fetch and parse.
-        organelle (str): The type of organelle to parse from the flatfiles.
+        flatfile (str): The path to the GenBank flatfile to parse.
+        organelle (str): The type of organelle to parse from the flatfile.
         args (argparse.Namespace): Command-line arguments passed to the script.
+        projection (dict, optional): A tree of keys as returned by
+            `projection_paths`. If set, only these fields are kept for each record.
 
     Returns:
-        list[dict]: A list of dictionaries containing the parsed data from the
-        flatfiles.
+        list[dict]: A list of dictionaries containing the parsed data from the flatfile.
+    """
+    with gzip.open(flatfile, "rb") as fh:
+        records = scan_flatfile(fh, args.root_taxon)
+        return parse_records(records, organelle, args, projection)
+
+
+def parse_stream(
+    url: str,
+    organelle: str,
+    args: argparse.Namespace,
+    projection: Optional[dict] = None,
+) -> list[dict]:
+    """Parse a remote GenBank flatfile while it is being downloaded.
+
+    Args:
+        url (str): The URL of the gzipped GenBank flatfile to parse.
+        organelle (str): The type of organelle to parse from the flatfile.
+        args (argparse.Namespace): Command-line arguments passed to the script.
+        projection (dict, optional): A tree of keys as returned by
+            `projection_paths`. If set, only these fields are kept for each record.
+
+    Returns:
+        list[dict]: A list of dictionaries containing the parsed data from the flatfile.
+    """
+    LOGGER.info("Streaming %s", url)
+    records = stream_records(url, args.root_taxon)
+    return parse_records(records, organelle, args, projection)
+
+
+def remove_tmp_file(flatfile: str) -> None:
+    """Remove a downloaded flatfile once it has been parsed.
+
+    Args:
+        flatfile (str): The path to the temporary flatfile.
+    """
+    with contextlib.suppress(OSError):
+        os.remove(flatfile)
+
+
+def fetch_flatfile(
+    url: str, organelle: str, args: argparse.Namespace, options: Optional[dict]
+) -> tuple[Optional[str], Optional[str], Optional[list[dict]]]:
+    """Fetch a flatfile unless parsed rows for its current version are cached.
+
+    Args:
+        url (str): The URL of the flatfile.
+        organelle (str): The type of organelle to parse from the flatfile.
+        args (argparse.Namespace): Command-line arguments passed to the script.
+        options (dict, optional): The parse options used as part of the cache key,
+            or None if the cache is not in use.
+
+    Returns:
+        tuple: The path to the downloaded flatfile (None if served from cache or
+            streamed), the validator for the remote file and the cached rows (None
+            if fetched).
     """
-    parsed: list[dict] = []
-    for url in listing:
-        LOGGER.info("Fetching %s", url)
-        flatfile = tofetch.fetch_tmp_file(url)
-        LOGGER.info("Parsing %s", url)
-        parsed += parse_flatfile(flatfile, organelle, args)
-    return parsed
+    validator = None
+    if options is not None:
+        validator = remote_validator(url)
+        if validator is not None:
+            rows = load_cached_rows(args.cache_dir, url, organelle, validator, options)
+            if rows is not None:
+                LOGGER.info("Using cached rows for %s", url)
+                return None, validator, rows
+    if args.stream:
+        return None, validator, None
+    LOGGER.info("Fetching %s", url)
+    return tofetch.fetch_tmp_file(url), validator, None
 
 
-def refseq_organelle_parser(args: argparse.Namespace, min_date: str) -> list[dict]:
+def parse_listing(
+    listing: list[tuple[str, str]],
+    args: argparse.Namespace,
+    projection: Optional[dict] = None,
+) -> Generator[dict, None, None]:
+    """Fetch and parse all URLs in a directory listing as a pipeline.
+
+    Up to `args.prefetch` files are downloaded ahead of the parser while up to
+    `args.workers` processes parse files that have already been downloaded. If
+    `args.stream` is set, each worker parses its file as it is downloaded instead.
+    Parsed records are yielded in listing order as soon as each file has been parsed.
+
+    If `args.cache_dir` is set and records are projected, rows for files whose
+    Last-Modified (or size) is unchanged are read from the cache instead of being
+    downloaded and parsed, and newly parsed rows are added to the cache.
+
+    Args:
+        listing (list[tuple[str, str]]): A list of (URL, organelle) pairs to fetch
+            and parse.
+        args (argparse.Namespace): Command-line arguments passed to the script.
+        projection (dict, optional): A tree of keys to keep for each record.
+
+    Yields:
+        dict: A dictionary containing the parsed data for a single record.
+    """
+    urls = iter(listing)
+    fetches: deque = deque()
+    parses: deque = deque()
+    prefetch = max(args.prefetch, 1)
+    workers = max(args.workers, 1)
+    options = None
+    if args.cache_dir and projection is not None:
+        options = {"rootTaxon": args.root_taxon, "projection": projection}
+    with ThreadPoolExecutor(max_workers=prefetch) as downloads, ProcessPoolExecutor(
+        max_workers=workers
+    ) as parsers:
+
+        def fetch_next() -> None:
+            if entry := next(urls, None):
+                fetch = downloads.submit(fetch_flatfile, *entry, args, options)
+                fetches.append((entry, fetch))
+
+        for _ in range(prefetch):
+            fetch_next()
+        try:
+            while fetches or parses:
+                if fetches:
+                    (url, organelle), fetch = fetches.popleft()
+                    flatfile, validator, rows = fetch.result()
+                    if rows is not None:
+                        parse = Future()
+                        parse.set_result(rows)
+                        validator = None
+                    elif args.stream:
+                        parse = parsers.submit(
+                            parse_stream, url, organelle, args, projection
+                        )
+                    else:
+                        LOGGER.info("Parsing %s", url)
+                        parse = parsers.submit(
+                            parse_flatfile, flatfile, organelle, args, projection
+                        )
+                    parses.append((url, organelle, flatfile, validator, parse))
+                    fetch_next()
+                while parses and (
+                    not fetches or len(parses) > workers or parses[0][-1].done()
+                ):
+                    url, organelle, flatfile, validator, parse = parses.popleft()
+                    try:
+                        rows = parse.result()
+                    finally:
+                        if flatfile is not None:
+                            remove_tmp_file(flatfile)
+                    if options is not None and validator is not None:
+                        save_cached_rows(
+                            args.cache_dir, url, organelle, validator, options, rows
+                        )
+                    yield from rows
+        finally:
+            # remove the files still queued if a parse fails or the consumer stops
+            for *_, parse in parses:
+                parse.cancel()
+            for _, fetch in fetches:
+                fetch.cancel()
+            for _, _, flatfile, _, _ in parses:
+                if flatfile is not None:
+                    remove_tmp_file(flatfile)
+            for _, fetch in fetches:
+                if not fetch.cancelled() and fetch.exception() is None:
+                    if (flatfile := fetch.result()[0]) is not None:
+                        remove_tmp_file(flatfile)
+
+
+def refseq_organelle_parser(
+    args: argparse.Namespace, min_date: str, projection: Optional[dict] = None
+) -> Generator[dict, None, None]:
     """Fetch and parse RefSeq organelle collections.
 
     This function fetches and parses RefSeq organelle collections based on the provided
         command-line arguments. It supports parsing multiple organelle types specified
-        in the `organelle` argument.
+        in the `organelle` argument. Files from all collections are fed through a
+        single download and parse pipeline.
 
     Args:
         args (argparse.Namespace): Command-line arguments passed to the script.
         min_date (str): The minimum date for the RefSeq organelle collections to be
         parsed.
+        projection (dict, optional): A tree of keys to keep for each record.
 
-    Returns:
-        list[dict]: A list of dictionaries containing the parsed data from the
-        flatfiles.
+    Yields:
+        dict: A dictionary containing the parsed data for a single record.
     """
     organelles = args.organelle
     if not isinstance(organelles, (list, tuple)):
         organelles = [organelles]
-    parsed: list[dict] = []
+    listing = []
     for organelle in organelles:
-        listing = refseq_listing(organelle, min_date)
-        parsed += parse_listing(listing, organelle, args)
-    return parsed
+        release = refseq_release(organelle)
+        if args.cache_dir:
+            evict_cache(args.cache_dir, organelle, [url for url, _ in release])
+        listing += [
+            (url, organelle)
+            for url, date in release
+            if min_date is None or date > min_date
+        ]
+    yield from parse_listing(listing, args, projection)
 
 
 def parse_args() -> argparse.Namespace:
@@ -318,6 +1075,14 @@ def parse_args() -> argparse.Namespace:
         -c, --config (str): Path to the YAML configuration file. Required.
         -i, --log-interval (int): Interval for logging progress. Default is 1.
         -r, --root-taxon (Optional[str]): Root taxon to filter by. Optional.
+        -p, --prefetch (int): Number of files to download ahead of the parser.
+            Default is 2.
+        -w, --workers (int): Number of processes used to parse flatfiles.
+            Default is 2.
+        --cache-dir (Optional[str]): Directory to cache parsed rows for each
+            release file. Optional.
+        --stream (bool): Decompress and parse each file while it is downloaded
+            instead of saving it to a temporary file first.
 
     Returns:
         argparse.Namespace: The parsed command-line arguments.
@@ -349,11 +1114,39 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "-r",
         "--root-taxon",
-        type=Optional[str],
+        type=str,
         default=None,
         required=False,
         help="Root taxon to filter by.",
     )
+    parser.add_argument(
+        "-p",
+        "--prefetch",
+        type=int,
+        default=2,
+        required=False,
+        help="Number of files to download ahead of the parser.",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=2,
+        required=False,
+        help="Number of processes used to parse flatfiles.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        required=False,
+        help="Directory to cache parsed rows for each release file.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Parse each file while it is downloaded instead of saving it first.",
+    )
 
     return parser.parse_args()
 
@@ -369,10 +1162,12 @@ def main() -> None:
         meta (dict): The metadata for the data processing.
         headers (list): The headers for the output data.
         parse_fns (dict): The parsing functions for the data.
+        projection (dict): The record fields referenced by the configuration.
         previous_parsed (dict): The previously parsed data.
         previous_date (str): The date of the previously parsed data.
-        raw_parsed (list): The raw parsed data.
-        parsed (list): The parsed data with values transformed.
+        parsed (Generator): The raw parsed data, streamed from the download and
+            parse pipeline.
+        rows (Generator): The parsed data with values transformed.
 
     Returns:
         None
@@ -389,10 +1184,14 @@ def main() -> None:
     except Exception:
         previous_parsed = {}
     previous_date = config["file"]["source_date"] if previous_parsed else None
-    parsed = refseq_organelle_parser(args, previous_date)
-    if not parsed:
+    projection = projection_paths(config)
+    parsed = refseq_organelle_parser(args, previous_date, projection)
+    first = next(parsed, None)
+    if first is None:
         return None
-    rows = [gh_utils.parse_report_values(parse_fns, data) for data in parsed]
+    rows = (
+        gh_utils.parse_report_values(parse_fns, data) for data in chain([first], parsed)
+    )
 
     if meta["file_name"].endswith(".gz"):
         meta["file_name"] = meta["file_name"][:-3]
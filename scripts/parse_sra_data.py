@@ -8,11 +8,11 @@ import shlex
 import subprocess
 import sys
 import xml.etree.ElementTree as ET
-from collections import defaultdict
+from collections import defaultdict, deque
 from datetime import date, timedelta
 from itertools import groupby
 from operator import itemgetter
-from typing import Any
+from typing import Any, Optional
 
 from dotenv import load_dotenv
 from genomehubs import utils as gh_utils
@@ -20,6 +20,63 @@ from tolkein import tolog
 
 LOGGER = tolog.logger(__name__)
 
+MAX_RUNS = 10
+
+
+def intern_value(value: Optional[str]) -> Optional[str]:
+    """
+    Intern a short, frequently repeated string value.
+
+    Args:
+        value (str, optional): The value to intern.
+
+    Returns:
+        str, optional: The interned value, or None if no value was provided.
+    """
+    return None if value is None else sys.intern(value)
+
+
+class SraRun:
+    """Compact record for a single SRA run.
+
+    Runs are held in their millions while grouping, so each run is stored as a
+    slotted object with interned platform and library source strings rather than
+    as a copy of its parent document.
+    """
+
+    __slots__ = (
+        "run_accession",
+        "sra_accession",
+        "library_source",
+        "platform",
+        "reads",
+    )
+
+    def __init__(
+        self,
+        run_accession: str,
+        sra_accession: Optional[str],
+        library_source: Optional[str],
+        platform: Optional[str],
+        reads: int,
+    ) -> None:
+        self.run_accession = run_accession
+        self.sra_accession = sra_accession
+        self.library_source = intern_value(library_source)
+        self.platform = intern_value(platform)
+        self.reads = reads
+
+
+class TaxonRuns:
+    """Run totals and the most recent runs for a single taxon."""
+
+    __slots__ = ("count", "reads", "runs")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.reads = 0
+        self.runs: deque[SraRun] = deque(maxlen=MAX_RUNS)
+
 
 def parse_arguments() -> argparse.Namespace:
     """Parse command line arguments.
@@ -108,9 +165,11 @@ def read_exp_xml(node: ET.Element, obj: dict[str, Any]) -> None:
         elif tag == "Experiment":
             obj["sra_accession"] = child.get("acc")
         elif tag == "Summary":
-            obj["platform"] = child.findtext("Platform")
+            obj["platform"] = intern_value(child.findtext("Platform"))
         elif tag == "Library_descriptor":
-            obj["library_source"] = child.findtext("LIBRARY_SOURCE").lower()
+            obj["library_source"] = intern_value(
+                child.findtext("LIBRARY_SOURCE").lower()
+            )
 
 
 def read_runs(node: ET.Element, obj: dict[str, Any]) -> None:
@@ -126,14 +185,46 @@ def read_runs(node: ET.Element, obj: dict[str, Any]) -> None:
 
     This function parses the Runs section of an XML element and extracts the accession
     and total_spots values for each child element. It then appends the parsed values to
-    the 'runs' list in the 'obj' dictionary.
+    the 'runs' list in the 'obj' dictionary as (accession, total_spots) tuples.
     """
     if "runs" not in obj:
         obj["runs"] = []
     for child in node:
-        obj["runs"].append(
-            {"accession": child.get("acc"), "reads": child.get("total_spots")}
+        obj["runs"].append((child.get("acc"), child.get("total_spots")))
+
+
+def compact_document(obj: dict[str, Any]) -> Optional[dict[str, Any]]:
+    """
+    Reduce a parsed document summary to the values needed for grouping.
+
+    Args:
+        obj (dict): The parsed document summary.
+
+    Returns:
+        dict, optional: A dictionary with the document date, an integer taxon_id and
+            a list of SraRun records, or None if the document has no usable taxon_id.
+            Runs without a valid read count are dropped.
+    """
+    try:
+        taxon_id = int(obj["taxon_id"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    runs = []
+    for accession, reads in obj.get("runs", []):
+        try:
+            reads = int(reads)
+        except (TypeError, ValueError):
+            continue
+        runs.append(
+            SraRun(
+                accession,
+                obj.get("sra_accession"),
+                obj.get("library_source"),
+                obj.get("platform"),
+                reads,
+            )
         )
+    return {"date": obj.get("date"), "taxon_id": taxon_id, "runs": runs}
 
 
 def open_file_based_on_extension(file_path, *_, **kwargs):
@@ -166,7 +257,8 @@ def parse_sra_xml(xml_file: str) -> list[dict]:
         xml_file (str): The path to the SRA xml file.
 
     Returns:
-        list: A list of dictionaries containing parsed information from the xml file.
+        list: A list of compact dictionaries containing the date, taxon_id and runs
+            parsed from each document summary in the xml file.
     """
     rows = []
     with open_file_based_on_extension(xml_file) as container_file:
@@ -191,7 +283,8 @@ def parse_sra_xml(xml_file: str) -> list[dict]:
                     elif tag == "Runs":
                         read_runs(child, obj)
                     continue
-                rows.append(obj)
+                if (row := compact_document(obj)) is not None:
+                    rows.append(row)
     return rows
 
 
@@ -202,9 +295,10 @@ def group_by_taxon(rows: list, grouped=None) -> list[dict]:
     Keep the most recent 10 rows only.
 
     Parameters:
-    - rows (list): A list of dictionaries representing SRA runs.
-    - grouped (dict, optional): A dictionary to store the grouped data. If not provided,
-                                a new dictionary will be created.
+    - rows (list): A list of compact documents, as returned by compact_document.
+    - grouped (dict, optional): A dictionary of TaxonRuns keyed by integer taxon_id to
+                                store the grouped data. If not provided, a new
+                                dictionary will be created.
 
     Returns:
     - rows (list): A list of dictionaries representing the grouped SRA runs.
@@ -213,25 +307,18 @@ def group_by_taxon(rows: list, grouped=None) -> list[dict]:
     ```
     rows = [
         {
+            "date": "2024/01/01",
             "taxon_id": 123,
             "runs": [
-                {
-                    "accession": "SRR123",
-                    "reads": 100
-                },
-                {
-                    "accession": "SRR456",
-                    "reads": 200
-                }
+                SraRun("SRR123", "SRR123", "", "", 100),
+                SraRun("SRR456", "SRR456", "", "", 200),
             ]
         },
         {
+            "date": "2024/01/02",
             "taxon_id": 456,
             "runs": [
-                {
-                    "accession": "SRR789",
-                    "reads": 150
-                }
+                SraRun("SRR789", "SRR789", "", "", 150),
             ]
         }
     ]
@@ -266,41 +353,25 @@ def group_by_taxon(rows: list, grouped=None) -> list[dict]:
     ```
     """
     if grouped is None or not grouped:
-        grouped = defaultdict(lambda: {"count": 0, "reads": 0, "runs": []})
+        grouped = defaultdict(TaxonRuns)
     for obj in sorted(rows, key=itemgetter("date")):
-        try:
-            taxon_id = obj["taxon_id"]
-        except Exception:
-            continue
+        taxon = grouped[obj["taxon_id"]]
         for run in obj["runs"]:
-            try:
-                row = {
-                    **obj,
-                    "run_accession": run["accession"],
-                    "reads": int(run["reads"]),
-                }
-            except Exception:
-                continue
-            row.pop("runs")
-            grouped[taxon_id]["runs"].insert(0, row)
-            grouped[taxon_id]["count"] += 1
-            grouped[taxon_id]["reads"] += row["reads"]
-            if len(grouped[taxon_id]["runs"]) > 10:
-                grouped[taxon_id]["runs"].pop()
+            taxon.runs.appendleft(run)
+            taxon.count += 1
+            taxon.reads += run.reads
     rows = [
         {
             "taxon_id": taxon_id,
-            "sra_accession": ";".join([item["sra_accession"] for item in obj["runs"]]),
-            "run_accession": ";".join([item["run_accession"] for item in obj["runs"]]),
-            "library_source": ";".join(
-                [item["library_source"] for item in obj["runs"]]
-            ),
-            "platform": ";".join([item["platform"] for item in obj["runs"]]),
-            "reads": ";".join([str(item["reads"]) for item in obj["runs"]]),
-            "total_reads": obj["reads"],
-            "total_runs": obj["count"],
+            "sra_accession": ";".join([run.sra_accession for run in taxon.runs]),
+            "run_accession": ";".join([run.run_accession for run in taxon.runs]),
+            "library_source": ";".join([run.library_source for run in taxon.runs]),
+            "platform": ";".join([run.platform for run in taxon.runs]),
+            "reads": ";".join([str(run.reads) for run in taxon.runs]),
+            "total_reads": taxon.reads,
+            "total_runs": taxon.count,
         }
-        for taxon_id, obj in grouped.items()
+        for taxon_id, taxon in grouped.items()
     ]
     return rows
 
@@ -313,13 +384,12 @@ def load_sra_tsv(file: str) -> dict:
         file (str): The path to the TSV file.
 
     Returns:
-        dict: A dictionary containing the grouped data. The keys are taxon_ids and the
-              values are dictionaries
-              with the following keys:
+        dict: A dictionary containing the grouped data. The keys are integer taxon_ids
+              and the values are TaxonRuns records with the following attributes:
               - count: The total number of runs for the taxon_id.
               - reads: The total number of reads for the taxon_id.
-              - runs: A list of dictionaries, each representing a run. Each run
-                      dictionary has the following keys:
+              - runs: A deque of up to MAX_RUNS SraRun records, most recent first.
+                Each run has the following attributes:
                 - run_accession: The accession number of the run.
                 - sra_accession: The accession number of the SRA.
                 - library_source: The source of the library.
@@ -328,33 +398,24 @@ def load_sra_tsv(file: str) -> dict:
     """
     if not os.path.isfile(file):
         return None
-    grouped = defaultdict(lambda: {"count": 0, "reads": 0, "runs": []})
+    grouped = defaultdict(TaxonRuns)
     with open_file_based_on_extension(file, newline="") as tsv_file:
         reader = csv.DictReader(tsv_file, delimiter="\t")
         for row in reader:
-            taxon_id = row["taxon_id"]
-            total_runs = row["total_runs"]
-            total_reads = row["total_reads"]
-            grouped[taxon_id]["count"] = int(total_runs)
-            grouped[taxon_id]["reads"] = int(total_reads)
-            for key in (
-                "run_accession",
-                "sra_accession",
-                "library_source",
-                "platform",
-                "reads",
-            ):
-                row[key] = row[key].split(";")
-            for index, run_accession in enumerate(row["run_accession"]):
-                grouped[taxon_id]["runs"].append(
-                    {
-                        "run_accession": run_accession,
-                        "sra_accession": row["sra_accession"][index],
-                        "library_source": row["library_source"][index],
-                        "platform": row["platform"][index],
-                        "reads": int(row["reads"][index]),
-                    }
-                )
+            taxon = grouped[int(row["taxon_id"])]
+            taxon.count = int(row["total_runs"])
+            taxon.reads = int(row["total_reads"])
+            columns = zip(
+                row["run_accession"].split(";"),
+                row["sra_accession"].split(";"),
+                row["library_source"].split(";"),
+                row["platform"].split(";"),
+                row["reads"].split(";"),
+            )
+            taxon.runs.extend(
+                SraRun(run_accession, sra_accession, source, platform, int(reads))
+                for run_accession, sra_accession, source, platform, reads in columns
+            )
     return grouped
 
 
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+from behave import given, then, when
+
+import scripts.import_status_lib as import_status_lib
+
+
+def replace_cleanup(project_table, strip_spaces):
+    project_table = project_table.replace(r"^\s*$", np.nan, regex=True)
+    if strip_spaces:
+        project_table = project_table.replace(r"^ +| +$", r"", regex=True)
+        project_table = project_table.replace("-", "", regex=False)
+    return project_table.replace("publication_available", "published", regex=False)
+
+
+@given("a sheet cell value of {value}")
+def step_given_cell_value(context, value):
+    context.project_table = pd.DataFrame(
+        {"value": [eval(value)], "length": [1.0]}, dtype=object
+    )
+
+
+@when("cleanup_values is called with strip_spaces {strip_spaces}")
+def step_when_cleanup_values_called(context, strip_spaces):
+    context.strip_spaces = strip_spaces == "True"
+    replacements = {"publication_available": "published"}
+    if context.strip_spaces:
+        replacements["-"] = ""
+    context.cleaned = import_status_lib.cleanup_values(
+        context.project_table,
+        strip_spaces=context.strip_spaces,
+        replacements=replacements,
+    )
+
+
+@then("the cleaned cell should be {expected}")
+def step_then_cleaned_cell(context, expected):
+    expected = eval(expected)
+    value = context.cleaned["value"].iloc[0]
+    if expected is None:
+        assert pd.isna(value)
+    else:
+        assert value == expected
+
+
+@then("the cleaned cell should match the whole-table replace")
+def step_then_matches_replace(context):
+    expected = replace_cleanup(context.project_table, context.strip_spaces)
+    pd.testing.assert_frame_equal(context.cleaned, expected, check_dtype=False)
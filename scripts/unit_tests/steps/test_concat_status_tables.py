@@ -0,0 +1,52 @@
+import pandas as pd
+from behave import given, then, when
+
+import scripts.import_status_lib as import_status_lib
+
+
+@given("categorized status tables for projects {first} and {second}")
+def step_given_status_tables(context, first, second):
+    context.tables = [
+        import_status_lib.fill_sequencing_status(
+            pd.DataFrame(
+                {
+                    "ncbi_taxon_id": ["1", "2"],
+                    "sequencing_status": ["published", None],
+                    "project": acronym,
+                },
+                dtype=object,
+            ),
+            acronym,
+        )
+        for acronym in (first, second)
+    ]
+
+
+@given("the ERGA table has no published column")
+def step_given_missing_column(context):
+    context.tables[1] = context.tables[1].drop(columns="published")
+
+
+@when("concat_status_tables is called")
+def step_when_concat_status_tables_called(context):
+    context.merged = import_status_lib.concat_status_tables(
+        [
+            import_status_lib.categorize_status_columns(table.copy())
+            for table in context.tables
+        ]
+    )
+
+
+@then("the {column} column should be categorical with categories {categories}")
+def step_then_categorical(context, column, categories):
+    dtype = context.merged[column].dtype
+    assert isinstance(dtype, pd.CategoricalDtype)
+    assert list(dtype.categories) == eval(categories)
+
+
+@then("the merged TSV should match merging the object tables")
+def step_then_tsv_matches(context):
+    expected = pd.concat(context.tables, ignore_index=True)
+    assert context.merged.to_csv(sep="\t", index=False) == expected.to_csv(
+        sep="\t", index=False
+    )
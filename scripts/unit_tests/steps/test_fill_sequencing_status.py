@@ -0,0 +1,39 @@
+import pandas as pd
+from behave import given, then, when
+
+import scripts.import_status_lib as import_status_lib
+
+
+@given("a sequencing status of {sequencing_status}")
+def step_given_sequencing_status(context, sequencing_status):
+    context.sequencing_status = (
+        None if sequencing_status == "None" else sequencing_status
+    )
+
+
+@given("an open column value of {open}")
+def step_given_open_value(context, open):
+    context.open = None if open == "None" else open
+
+
+@when("fill_sequencing_status is called with acronym {acronym}")
+def step_when_fill_sequencing_status_called(context, acronym):
+    project_table = pd.DataFrame(
+        {"sequencing_status": [context.sequencing_status], "open": [context.open]},
+        dtype=object,
+    )
+    context.project_table = import_status_lib.fill_sequencing_status(
+        project_table, acronym
+    )
+    context.acronym = acronym
+
+
+@then("the statuses set to DTOL should be {expected}")
+def step_then_statuses_set(context, expected):
+    row = context.project_table.iloc[0]
+    statuses = [
+        status
+        for status in import_status_lib.SEQUENCING_STATUSES
+        if row[status] == context.acronym
+    ]
+    assert statuses == eval(expected)
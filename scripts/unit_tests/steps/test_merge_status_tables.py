@@ -0,0 +1,62 @@
+import pandas as pd
+from behave import given, then, when
+
+import scripts.import_status_lib as import_status_lib
+
+
+def expanded_status_list(acronym, taxa, open_taxon):
+    taxa = taxa.split(",")
+    project_table = pd.DataFrame(
+        {
+            "ncbi_taxon_id": taxa,
+            "species": [f"Species {taxon}" for taxon in taxa],
+            "sequencing_status": [
+                "open" if taxon == open_taxon else None for taxon in taxa
+            ],
+            "project": acronym,
+        },
+        dtype=object,
+    )
+    return import_status_lib.fill_sequencing_status(project_table, acronym)
+
+
+@given(
+    "an expanded status list for {acronym} with taxa {taxa} "
+    "and open status for {open_taxon}"
+)
+def step_given_expanded_status_list(context, acronym, taxa, open_taxon):
+    if "tables" not in context:
+        context.tables = []
+    context.tables.append(expanded_status_list(acronym, taxa, open_taxon))
+
+
+@when("merge_status_tables is called")
+def step_when_merge_status_tables_called(context):
+    context.merged = import_status_lib.merge_status_tables(context.tables)
+
+
+@when(
+    "the merge is compared with a previous merge of {acronym} with taxa {taxa} "
+    "and open status for {open_taxon}"
+)
+def step_when_diff_status_tables_called(context, acronym, taxa, open_taxon):
+    previous = import_status_lib.merge_status_tables(
+        [expanded_status_list(acronym, taxa, open_taxon)]
+    )
+    context.diff = import_status_lib.diff_status_tables(previous, context.merged)
+
+
+@then("the merged table should have taxa {taxa}")
+def step_then_merged_taxa(context, taxa):
+    assert list(context.merged.index) == eval(taxa)
+
+
+@then("the merged {column} column for {taxon} should be {expected}")
+def step_then_merged_value(context, column, taxon, expected):
+    assert context.merged.loc[taxon, column] == expected
+
+
+@then("the changes should be {expected}")
+def step_then_changes(context, expected):
+    changes = dict(zip(context.diff["ncbi_taxon_id"], context.diff["change"]))
+    assert changes == eval(expected)
@@ -0,0 +1,30 @@
+from behave import given, then, when
+
+import scripts.ipbes_reports as ipbes_reports
+
+
+@given("per-country group counts {country_counts}")
+def step_given_country_counts(context, country_counts):
+    context.country_counts = eval(country_counts)
+
+
+@given("an overall group count of {group_count:d}")
+def step_given_group_count(context, group_count):
+    context.group_count = group_count
+
+
+@when("pack_country_codes is called with max_bins {max_bins:d}")
+def step_when_pack_country_codes_called(context, max_bins):
+    context.max_bins = max_bins
+    context.chunks = ipbes_reports.pack_country_codes(
+        context.country_counts, context.group_count, max_bins
+    )
+
+
+@then("the country chunks should be {expected}")
+def step_then_country_chunks(context, expected):
+    assert context.chunks == eval(expected)
+    for chunk in context.chunks:
+        total = sum(context.country_counts[code] for code in chunk)
+        bins = ipbes_reports.chunk_bins(len(chunk), total, context.group_count)
+        assert len(chunk) == 1 or bins <= context.max_bins
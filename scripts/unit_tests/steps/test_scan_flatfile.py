@@ -0,0 +1,21 @@
+import io
+
+from behave import given, then, when
+
+import scripts.parse_refseq_organelles as parse_refseq_organelles
+
+
+@given("a GenBank flatfile")
+def step_given_genbank_flatfile(context):
+    context.flatfile = io.BytesIO(context.text.encode())
+
+
+@when("scan_flatfile is called")
+def step_when_scan_flatfile_called(context):
+    context.records = list(parse_refseq_organelles.scan_flatfile(context.flatfile))
+
+
+@then("the scanned record {attribute} should be {expected}")
+def step_then_scanned_record_attribute(context, attribute, expected):
+    assert len(context.records) == 1
+    assert eval(f"record.{attribute}", {"record": context.records[0]}) == eval(expected)
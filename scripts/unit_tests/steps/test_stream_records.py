@@ -0,0 +1,75 @@
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError
+
+from behave import given, then, when
+
+import scripts.parse_refseq_organelles as parse_refseq_organelles
+
+
+class FlatfileHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests += 1
+        if self.server.errors > 0:
+            self.server.errors -= 1
+            self.send_error(self.server.status)
+            return
+        body = self.server.body
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.server.truncated > 0:
+            self.server.truncated -= 1
+            body = body[: len(body) // 2]
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@given("the flatfile is served gzipped by a local HTTP server")
+def step_given_local_http_server(context):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FlatfileHandler)
+    server.body = gzip.compress(context.flatfile.getvalue())
+    server.truncated = 0
+    server.errors = 0
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    context.add_cleanup(server.server_close)
+    context.add_cleanup(server.shutdown)
+    context.server = server
+    context.url = f"http://127.0.0.1:{server.server_port}/flatfile.gbff.gz"
+
+
+@given("the first {truncated:d} responses are truncated")
+def step_given_truncated_responses(context, truncated):
+    context.server.truncated = truncated
+
+
+@given("the first {errors:d} responses fail with status {status:d}")
+def step_given_failed_responses(context, errors, status):
+    context.server.errors = errors
+    context.server.status = status
+
+
+@when("stream_records is called with root taxon {root_taxon}")
+def step_when_stream_records_called(context, root_taxon):
+    records = parse_refseq_organelles.stream_records(context.url, eval(root_taxon))
+    try:
+        context.records = list(records)
+        context.error = None
+    except HTTPError as err:
+        context.records = []
+        context.error = err.code
+
+
+@then("the streamed record ids should be {expected}")
+def step_then_streamed_record_ids(context, expected):
+    assert [record.id for record in context.records] == eval(expected)
+
+
+@then("stream_records should fail with status {status} after {requests:d} requests")
+def step_then_stream_records_failed(context, status, requests):
+    assert context.error == eval(status)
+    assert context.server.requests == requests
@@ -0,0 +1,30 @@
+import os
+import tempfile
+
+from behave import given, then, when
+
+import scripts.ipbes_reports as ipbes_reports
+
+
+@given("per-modifier results {result_sets}")
+def step_given_result_sets(context, result_sets):
+    context.result_sets = eval(result_sets)
+
+
+@when("results_to_matrix is written to CSV with modifiers {modifiers}")
+def step_when_matrix_written(context, modifiers):
+    countries, keys, values, key_indices = ipbes_reports.results_to_matrix(
+        context.result_sets
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        outfile = os.path.join(tmp_dir, "report.csv")
+        ipbes_reports.write_matrix_to_csv(
+            countries, keys, values, key_indices, "order", eval(modifiers), {}, outfile
+        )
+        with open(outfile) as csvfile:
+            context.rows = csvfile.read().splitlines()[1:]
+
+
+@then("the CSV rows should be {expected}")
+def step_then_csv_rows(context, expected):
+    assert context.rows == eval(expected)
@@ -0,0 +1,19 @@
+Feature: Testing cleanup_values function
+
+  Scenario Outline: Testing cleanup_values function matches whole-table replace
+    Given a sheet cell value of <value>
+    When cleanup_values is called with strip_spaces <strip_spaces>
+    Then the cleaned cell should be <expected>
+    And the cleaned cell should match the whole-table replace
+
+    Examples:
+      | value                   | strip_spaces | expected    |
+      | ""                      | False        | None        |
+      | "   "                   | True         | None        |
+      | "\t"                    | True         | None        |
+      | " DTOL "                | False        | " DTOL "    |
+      | " DTOL "                | True         | "DTOL"      |
+      | "publication_available" | False        | "published" |
+      | " - "                   | True         | ""          |
+      | "-"                     | False        | "-"         |
+      | None                    | True         | None        |
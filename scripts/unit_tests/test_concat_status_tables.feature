@@ -0,0 +1,14 @@
+Feature: Testing concat_status_tables function
+
+  Scenario: Testing concat_status_tables function keeps status columns categorical
+    Given categorized status tables for projects DTOL and ERGA
+    When concat_status_tables is called
+    Then the open column should be categorical with categories ["DTOL", "ERGA"]
+    And the merged TSV should match merging the object tables
+
+  Scenario: Testing concat_status_tables function with a status column missing from one table
+    Given categorized status tables for projects DTOL and ERGA
+    And the ERGA table has no published column
+    When concat_status_tables is called
+    Then the published column should be categorical with categories ["DTOL"]
+    And the merged TSV should match merging the object tables
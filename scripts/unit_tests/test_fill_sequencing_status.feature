@@ -0,0 +1,17 @@
+Feature: Testing fill_sequencing_status function
+
+  Scenario Outline: Testing fill_sequencing_status function with different sequencing statuses
+    Given a sequencing status of <sequencing_status>
+    And an open column value of <open>
+    When fill_sequencing_status is called with acronym DTOL
+    Then the statuses set to DTOL should be <expected>
+
+    Examples:
+      | sequencing_status | open | expected                                                                              |
+      | published         | None | ["sample_collected", "sample_acquired", "in_progress", "open", "insdc_open", "published"] |
+      | in_assembly       | None | ["sample_collected", "sample_acquired", "in_progress", "in_assembly"]                 |
+      | insdc_submitted   | None | ["insdc_submitted"]                                                                   |
+      | sample_acquired   | None | ["sample_collected", "sample_acquired"]                                               |
+      | unknown           | None | []                                                                                    |
+      | None              | DTOL | ["sample_collected", "sample_acquired", "in_progress", "open"]                        |
+      | sample_collected  | ERGA | ["sample_collected"]                                                                  |
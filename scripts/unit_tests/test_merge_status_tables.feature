@@ -0,0 +1,15 @@
+Feature: Testing merge_status_tables function
+
+  Scenario: Testing merge_status_tables function joins acronyms for each taxon
+    Given an expanded status list for DTOL with taxa 9606,10090 and open status for 9606
+    And an expanded status list for ERGA with taxa 9606 and open status for 9606
+    When merge_status_tables is called
+    Then the merged table should have taxa ["9606", "10090"]
+    And the merged open column for 9606 should be DTOL,ERGA
+    And the merged project column for 10090 should be DTOL
+
+  Scenario: Testing diff_status_tables function reports row-level changes
+    Given an expanded status list for DTOL with taxa 9606,10090 and open status for 9606
+    When merge_status_tables is called
+    And the merge is compared with a previous merge of DTOL with taxa 9606,7227 and open status for 7227
+    Then the changes should be {"10090": "added", "7227": "removed", "9606": "changed"}
@@ -0,0 +1,15 @@
+Feature: Testing pack_country_codes function
+
+  Scenario Outline: Testing pack_country_codes function with per-country group counts
+    Given per-country group counts <country_counts>
+    And an overall group count of <group_count>
+    When pack_country_codes is called with max_bins <max_bins>
+    Then the country chunks should be <expected>
+
+    Examples:
+      | country_counts                            | group_count | max_bins | expected                         |
+      | {"aa": 20, "bb": 20, "cc": 20}            | 100         | 100      | [["aa", "bb"], ["cc"]]           |
+      | {"aa": 90, "bb": 5, "cc": 3, "dd": 2}     | 100         | 200      | [["aa", "bb"], ["cc", "dd"]]     |
+      | {"aa": 1, "bb": 1, "cc": 1, "dd": 1}      | 100         | 16       | [["aa", "bb", "cc", "dd"]]       |
+      | {"aa": 50, "bb": 50, "cc": 0}             | 60          | 120      | [["aa", "bb"], ["cc"]]           |
+      | {"aa": 0, "bb": 0}                        | 0           | 10       | [["aa", "bb"]]                   |
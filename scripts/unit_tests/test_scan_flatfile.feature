@@ -0,0 +1,53 @@
+Feature: Testing scan_flatfile function
+
+  Scenario Outline: Testing scan_flatfile function on a RefSeq organelle record
+    Given a GenBank flatfile
+      """
+      LOCUS       NC_012920              16569 bp    DNA     circular PRI 13-NOV-2023
+      DEFINITION  Homo sapiens mitochondrion, complete genome.
+      ACCESSION   NC_012920 AC_000021
+      VERSION     NC_012920.1
+      DBLINK      BioProject: PRJNA30353
+                  BioSample: SAMN00000001
+      KEYWORDS    RefSeq.
+      SOURCE      mitochondrion Homo sapiens (human)
+        ORGANISM  Homo sapiens
+                  Eukaryota; Metazoa; Chordata; Craniata; Vertebrata; Euteleostomi;
+                  Mammalia; Primates; Hominidae; Homo.
+      REFERENCE   1  (bases 1 to 16569)
+        CONSRTM   NCBI Genome Project
+        TITLE     Direct Submission
+        JOURNAL   Submitted (10-OCT-2003) National Center for Biotechnology
+                  Information, NIH, Bethesda, MD 20894, USA
+      COMMENT     REVIEWED REFSEQ: The reference sequence is identical to J01415.
+                  COMPLETENESS: full length.
+                  ##Genome-Annotation-Data-START##
+                  Annotation Provider :: NCBI
+                  ##Genome-Annotation-Data-END##
+      FEATURES             Location/Qualifiers
+           source          1..16569
+                           /organism="Homo sapiens"
+                           /db_xref="taxon:9606"
+                           /lat_lon="51.50 N
+                           0.12 W"
+           gene            577..647
+                           /db_xref="GeneID:4558"
+      ORIGIN
+              1 gatcacaggt ctatcaccct
+             21 nnacgt
+      //
+      """
+    When scan_flatfile is called
+    Then the scanned record <attribute> should be <expected>
+
+    Examples:
+      | attribute                            | expected                                                                                              |
+      | id                                   | "NC_012920.1"                                                                                         |
+      | annotations["date"]                  | "13-NOV-2023"                                                                                         |
+      | annotations["organism"]              | "Homo sapiens"                                                                                        |
+      | annotations["taxonomy"][-2:]         | ["Hominidae", "Homo"]                                                                                 |
+      | annotations["comment"]               | "REVIEWED REFSEQ: The reference sequence is identical to J01415.\nCOMPLETENESS: full length."         |
+      | annotations["references"][0].journal | "Submitted (10-OCT-2003) National Center for Biotechnology Information, NIH, Bethesda, MD 20894, USA" |
+      | dbxrefs                              | ["BioProject:PRJNA30353", "BioSample:SAMN00000001"]                                                   |
+      | features[0].qualifiers               | {"organism": ["Homo sapiens"], "db_xref": ["taxon:9606"], "lat_lon": ["51.50 N 0.12 W"]}              |
+      | seq                                  | b"gatcacaggtctatcaccctnnacgt"                                                                         |
@@ -0,0 +1,89 @@
+Feature: Testing stream_records function
+
+  Scenario Outline: Testing stream_records function against a local HTTP server
+    Given a GenBank flatfile
+      """
+      LOCUS       NC_000001               8 bp    DNA     circular INV 01-JAN-2024
+      DEFINITION  Genus species1 mitochondrion, complete genome.
+      ACCESSION   NC_000001
+      VERSION     NC_000001.1
+      SOURCE      mitochondrion Genus species1
+        ORGANISM  Genus species1
+                  Eukaryota; Metazoa; Arthropoda; Insecta; Genus.
+      FEATURES             Location/Qualifiers
+           source          1..8
+                           /organism="Genus species1"
+                           /db_xref="taxon:1001"
+      ORIGIN
+              1 acgtacgt
+      //
+      LOCUS       NC_000002               8 bp    DNA     circular INV 02-JAN-2024
+      DEFINITION  Genus species2 mitochondrion, complete genome.
+      ACCESSION   NC_000002
+      VERSION     NC_000002.1
+      SOURCE      mitochondrion Genus species2
+        ORGANISM  Genus species2
+                  Eukaryota; Metazoa; Chordata; Mammalia; Genus.
+      FEATURES             Location/Qualifiers
+           source          1..8
+                           /organism="Genus species2"
+                           /db_xref="taxon:1002"
+      ORIGIN
+              1 ggccggcc
+      //
+      """
+    And the flatfile is served gzipped by a local HTTP server
+    And the first <truncated> responses are truncated
+    When stream_records is called with root taxon <root_taxon>
+    Then the streamed record ids should be <expected>
+
+    Examples:
+      | truncated | root_taxon | expected                         |
+      | 0         | None       | ["NC_000001.1", "NC_000002.1"]   |
+      | 1         | None       | ["NC_000001.1", "NC_000002.1"]   |
+      | 2         | None       | ["NC_000001.1", "NC_000002.1"]   |
+      | 1         | "Chordata" | ["NC_000002.1"]                  |
+
+  Scenario Outline: Testing stream_records function with HTTP errors
+    Given a GenBank flatfile
+      """
+      LOCUS       NC_000001               8 bp    DNA     circular INV 01-JAN-2024
+      DEFINITION  Genus species1 mitochondrion, complete genome.
+      ACCESSION   NC_000001
+      VERSION     NC_000001.1
+      SOURCE      mitochondrion Genus species1
+        ORGANISM  Genus species1
+                  Eukaryota; Metazoa; Arthropoda; Insecta; Genus.
+      FEATURES             Location/Qualifiers
+           source          1..8
+                           /organism="Genus species1"
+                           /db_xref="taxon:1001"
+      ORIGIN
+              1 acgtacgt
+      //
+      LOCUS       NC_000002               8 bp    DNA     circular INV 02-JAN-2024
+      DEFINITION  Genus species2 mitochondrion, complete genome.
+      ACCESSION   NC_000002
+      VERSION     NC_000002.1
+      SOURCE      mitochondrion Genus species2
+        ORGANISM  Genus species2
+                  Eukaryota; Metazoa; Chordata; Mammalia; Genus.
+      FEATURES             Location/Qualifiers
+           source          1..8
+                           /organism="Genus species2"
+                           /db_xref="taxon:1002"
+      ORIGIN
+              1 ggccggcc
+      //
+      """
+    And the flatfile is served gzipped by a local HTTP server
+    And the first <errors> responses fail with status <status>
+    When stream_records is called with root taxon None
+    Then the streamed record ids should be <expected>
+    And stream_records should fail with status <error> after <requests> requests
+
+    Examples:
+      | errors | status | expected                       | error | requests |
+      | 1      | 404    | []                             | 404   | 1        |
+      | 1      | 403    | []                             | 403   | 1        |
+      | 2      | 503    | ["NC_000001.1", "NC_000002.1"] | None  | 3        |
@@ -0,0 +1,12 @@
+Feature: Testing write_matrix_to_csv function
+
+  Scenario Outline: Testing write_matrix_to_csv function with per-modifier results
+    Given per-modifier results <result_sets>
+    When results_to_matrix is written to CSV with modifiers <modifiers>
+    Then the CSV rows should be <expected>
+
+    Examples:
+      | result_sets                                                                            | modifiers | expected                                                       |
+      | [{"gb": {"b": 1, "a": 2}, "fr": {"a": 3, "c": 4, "b": 5}}, {"fr": {"c": 1}}]           | ["", "m"] | ["GB,b,1,0", "GB,a,2,0", "FR,a,3,0", "FR,c,4,1", "FR,b,5,0"]   |
+      | [{1: {"TOTAL": 9, "c": 1}, 7: {"a": 1}, "gb": {"c": 2, "TOTAL": 3}}, {"gb": {"c": 1}}] | ["", "m"] | ["TOTAL,TOTAL,9,0", "TOTAL,c,1,0", "GB,c,2,1", "GB,TOTAL,3,0"] |
+      | [{"gb": {"a": 1}}]                                                                     | [""]      | ["GB,a,1"]                                                     |